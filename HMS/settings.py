@@ -31,6 +31,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'accounts.metrics.RequestMetricsMiddleware',
+    'accounts.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -63,14 +65,28 @@ TEMPLATES = [
 # DATABASE CONFIG
 # =========================
 
+# DATABASE_POOL=true keeps a per-process psycopg pool instead of one
+# persistent connection per thread; it needs psycopg 3:
+#   pip install "psycopg[binary,pool]"
+DATABASE_POOL = os.getenv('DATABASE_POOL', 'False').lower() == 'true'
+DATABASE_POOL_OPTIONS = {
+    'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+    'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '10')),
+    'timeout': int(os.getenv('DATABASE_POOL_TIMEOUT', '10')),
+}
+
 if os.getenv("DATABASE_URL"):
     DATABASES = {
         "default": dj_database_url.parse(
             os.environ.get("DATABASE_URL"),
-            conn_max_age=600,
+            # Pooled connections go back to the pool after each request.
+            conn_max_age=0 if DATABASE_POOL else 600,
+            conn_health_checks=True,
             ssl_require=True
         )
     }
+    if DATABASE_POOL:
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {**DATABASE_POOL_OPTIONS}
 else:
     DATABASES = {
         'default': {
@@ -79,6 +95,34 @@ else:
         }
     }
 
+# Comma-separated read replica URLs, e.g. postgres://...,postgres://...
+# Locally, sqlite:////abs/path/replica.sqlite3 (a copy of db.sqlite3) works.
+for index, replica_url in enumerate(filter(None, os.getenv('DATABASE_REPLICA_URLS', '').split(',')), start=1):
+    replica_url = replica_url.strip()
+    is_sqlite = replica_url.startswith('sqlite')
+    DATABASES[f'replica{index}'] = {
+        **dj_database_url.parse(
+            replica_url,
+            conn_max_age=0 if DATABASE_POOL and not is_sqlite else 600,
+            conn_health_checks=True,
+            ssl_require=not is_sqlite,
+        ),
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DATABASE_POOL and not is_sqlite:
+        DATABASES[f'replica{index}'].setdefault('OPTIONS', {})['pool'] = {**DATABASE_POOL_OPTIONS}
+
+DATABASE_ROUTERS = ['accounts.routers.ReplicaRouter']
+# How long a browser that just wrote keeps reading from the primary.
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+
+# Background jobs (accounts.jobs, run by `manage.py run_workers`). A running
+# job whose worker stops heartbeating for JOB_LEASE_SECONDS is run again;
+# failures are retried after JOB_RETRY_DELAY_SECONDS, doubling each time.
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_RETRY_DELAY_SECONDS = int(os.getenv('JOB_RETRY_DELAY_SECONDS', '30'))
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '300'))
+
 # =========================
 # REDIS CONFIG
 # =========================
@@ -104,6 +148,11 @@ else:
 
 AUTH_USER_MODEL = 'accounts.User'
 
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # =========================
 # STATIC FILES FIX
 # =========================
@@ -118,6 +167,10 @@ STATICFILES_DIRS = [
 
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Files produced by background jobs (exports). Web and worker processes must
+# share this directory.
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', str(BASE_DIR / 'media'))
+
 # =========================
 # REST FRAMEWORK
 # =========================
@@ -129,6 +182,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'accounts.pagination.KeysetCursorPagination',
 }
 
 SIMPLE_JWT = {
@@ -137,6 +191,10 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Prometheus scrapers send `Authorization: Bearer <METRICS_TOKEN>` to /metrics;
+# admins can also open it from a logged-in session.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
 if not DEBUG:
@@ -2,19 +2,24 @@ from django.shortcuts import render
 
 from accounts.views import (
     admin_billing_history_view,
+    admin_doctors_bulk_view,
+    admin_export_view,
+    admin_job_download_view,
+    admin_job_view,
     admin_page_view,
+    admin_section_view,
     about_us_view,
     book_appointment_gate_view,
     contact_us_view,
     doctor_billing_view,
     doctor_page_view,
     guest_user_view,
-    login_admin_view,
-    login_doctor_view,
     login_options_view,
-    login_patient_view,
+    login_portal_view,
     logout_view,
+    metrics_view,
     patient_page_view,
+    portal_appointment_action_view,
     register_doctor_view,
     register_options_view,
     register_patient_view,
@@ -34,9 +39,9 @@ urlpatterns = [
     path('guest/', guest_user_view, name='guest-user'),
     path('book-appointment/', book_appointment_gate_view, name='book-appointment-gate'),
     path('login/', login_options_view, name='login-options'),
-    path('login/admin/', login_admin_view, name='login-admin'),
-    path('login/patient/', login_patient_view, name='login-patient'),
-    path('login/doctor/', login_doctor_view, name='login-doctor'),
+    path('login/admin/', login_portal_view, {'portal': 'admin'}, name='login-admin'),
+    path('login/patient/', login_portal_view, {'portal': 'patient'}, name='login-patient'),
+    path('login/doctor/', login_portal_view, {'portal': 'doctor'}, name='login-doctor'),
     path('logout/', logout_view, name='logout'),
     path('admin/login/', RedirectView.as_view(url='/login/admin/', permanent=False)),
     path('register/', register_options_view, name='register-options'),
@@ -44,10 +49,18 @@ urlpatterns = [
     path('register/doctor/', register_doctor_view, name='register-doctor'),
     path('hms-admin/', RedirectView.as_view(url='/admin/', permanent=False)),
     path('admin/', admin_page_view, name='admin-page'),
+    path('admin/sections/<str:section>/', admin_section_view, name='admin-section'),
+    path('admin/doctors/bulk/', admin_doctors_bulk_view, name='admin-doctors-bulk'),
     path('admin/billing-history/', admin_billing_history_view, name='admin-billing-history'),
+    path('admin/export/<slug:dataset>.<slug:fmt>', admin_export_view, name='admin-export'),
+    path('admin/jobs/<int:job_id>/', admin_job_view, name='admin-job'),
+    path('admin/jobs/<int:job_id>/download/', admin_job_download_view, name='admin-job-download'),
     path('doctor/', doctor_page_view, name='doctor-page'),
     path('doctor/billing/', doctor_billing_view, name='doctor-billing'),
+    path('doctor/appointments/<int:appointment_id>/<slug:action>/', portal_appointment_action_view, {'portal': 'doctor'}, name='doctor-appointment-action'),
     path('patient/', patient_page_view, name='patient-page'),
+    path('patient/appointments/<int:appointment_id>/<slug:action>/', portal_appointment_action_view, {'portal': 'patient'}, name='patient-appointment-action'),
+    path('metrics', metrics_view, name='metrics'),
     path('api/auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/accounts/', include('accounts.urls')),
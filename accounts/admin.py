@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.utils import timezone
 
-from .models import ContactQuery, Doctor, Patient, User
+from .models import ContactQuery, Doctor, Job, Patient, Specialization, User
+from .search import FullTextSearchAdminMixin
 
 
 @admin.register(User)
@@ -11,9 +12,16 @@ class UserAdmin(admin.ModelAdmin):
     search_fields = ('username', 'email')
 
 
+@admin.register(Specialization)
+class SpecializationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'normalized_name')
+    search_fields = ('normalized_name',)
+
+
 @admin.register(Doctor)
 class DoctorAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'specialization', 'license_number')
+    exclude = ('specialty',)
     search_fields = ('user__username', 'specialization', 'license_number')
 
 
@@ -24,7 +32,8 @@ class PatientAdmin(admin.ModelAdmin):
 
 
 @admin.register(ContactQuery)
-class ContactQueryAdmin(admin.ModelAdmin):
+class ContactQueryAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    search_kind = 'queries'
     list_display = ('id', 'name', 'age', 'dob', 'created_at', 'replied_at')
     search_fields = ('name', 'address', 'problem', 'admin_reply')
     list_filter = ('created_at', 'replied_at')
@@ -43,3 +52,10 @@ class ContactQueryAdmin(admin.ModelAdmin):
             obj.replied_at = timezone.now()
 
         super().save_model(request, obj, form, change)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'progress', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('worker', 'heartbeat_at', 'started_at', 'finished_at', 'created_at')
@@ -0,0 +1,19 @@
+from django.db import connections
+
+
+def count_querysets(**querysets):
+    # Fold several COUNT(*) queries into one round-trip by selecting each
+    # count as a scalar subquery: SELECT (SELECT COUNT(*) ...), (...).
+    using = next(iter(querysets.values())).db
+    connection = connections[using]
+    columns = []
+    params = []
+    for index, (name, queryset) in enumerate(querysets.items()):
+        sql, sql_params = queryset.order_by().values('pk').query.sql_with_params()
+        columns.append(f'(SELECT COUNT(*) FROM ({sql}) AS sub{index}) AS {connection.ops.quote_name(name)}')
+        params.extend(sql_params)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(columns)}", params)
+        row = cursor.fetchone()
+    return dict(zip(querysets.keys(), row))
@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .fragments import bump_fragment_versions
+from .models import Doctor, User
+from .specializations import invalidate_specialization_index
+
+
+def pending_doctors(doctor_ids):
+    return Doctor.objects.filter(pk__in=doctor_ids, user__role='DOCTOR', user__is_active=False, rejected_at__isnull=True)
+
+
+def rejected_doctors(doctor_ids):
+    return Doctor.objects.filter(pk__in=doctor_ids, user__is_active=False, rejected_at__isnull=False)
+
+
+def approve_doctors(doctor_ids):
+    # One set-based UPDATE instead of a save() per doctor. update() sends no
+    # signals, so the caches those hooks would refresh are refreshed here.
+    with transaction.atomic():
+        pairs = list(pending_doctors(doctor_ids).select_for_update().values_list('pk', 'user_id'))
+        if not pairs:
+            return []
+        approved = [pk for pk, _ in pairs]
+        User.objects.filter(pk__in=[user_id for _, user_id in pairs]).update(is_active=True)
+        # Moves the ETag of the doctor list and detail endpoints.
+        Doctor.objects.filter(pk__in=approved).update(updated_at=timezone.now())
+        invalidate_specialization_index()
+        bump_fragment_versions('people')
+    return approved
+
+
+def reject_doctors(doctor_ids):
+    # Marks the doctors rejected at once, so they leave the pending list and
+    # can no longer be approved; the reject_doctors job deletes them later.
+    with transaction.atomic():
+        pairs = list(pending_doctors(doctor_ids).select_for_update().values_list('pk', 'user_id'))
+        if not pairs:
+            return []
+        rejected = [pk for pk, _ in pairs]
+        User.objects.filter(pk__in=[user_id for _, user_id in pairs]).update(is_active=False)
+        Doctor.objects.filter(pk__in=rejected).update(rejected_at=timezone.now(), updated_at=timezone.now())
+        bump_fragment_versions('people')
+    return rejected
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models.functions import Lower
+
+User = get_user_model()
+
+PROFILE_RELATIONS = ('doctor_profile', 'patient_profile')
+
+
+def check_email_credentials(email, password):
+    # One indexed query (LOWER(email)) that also brings back role, is_active
+    # and whichever profile the portal will render next.
+    user = (
+        User.objects.select_related(*PROFILE_RELATIONS)
+        .alias(email_lower=Lower('email'))
+        .filter(email_lower=email.lower())
+        .order_by('pk')
+        .first()
+    )
+    if user is None:
+        # Run the hasher anyway so response time does not reveal whether
+        # the email is registered.
+        User().set_password(password)
+        return None
+    return user if user.check_password(password) else None
+
+
+class EmailBackend(ModelBackend):
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+        user = check_email_credentials(email, password)
+        if user is not None and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def get_user(self, user_id):
+        # Session requests load the profile in the same query as the user.
+        user = User._default_manager.select_related(*PROFILE_RELATIONS).filter(pk=user_id).first()
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -0,0 +1,297 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, models, router, transaction
+from django.dispatch import Signal
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+MAX_BULK_ITEMS = 500
+BULK_CONFLICT_MESSAGE = 'The batch conflicts with a concurrent change; no rows were written.'
+
+# bulk_create()/bulk_update() skip save() and post_save, so bulk writes send
+# this instead. `previous` holds each instance's counter_state() before the
+# write, or None for created rows.
+bulk_saved = Signal()
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    # Resolves against objects fetched up front by BulkListSerializer rather
+    # than issuing one SELECT per item.
+    preloaded = None
+
+    def to_internal_value(self, data):
+        if self.preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            key = self.get_queryset().model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return self.preloaded[key]
+        except (KeyError, TypeError):
+            self.fail('does_not_exist', pk_value=data)
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _condition_matches(condition, values):
+    # Evaluates the equality-only conditions used by our partial unique
+    # constraints in Python, so each item does not need its own query.
+    results = []
+    for child in condition.children:
+        if isinstance(child, models.Q):
+            results.append(_condition_matches(child, values))
+            continue
+        lookup, expected = child
+        name = lookup.removesuffix('__exact')
+        if '__' in name or name not in values:
+            raise _Unsupported
+        results.append(values[name] == expected)
+    matched = all(results) if condition.connector == models.Q.AND else any(results)
+    return matched != condition.negated
+
+
+def _key_value(value):
+    return value.pk if isinstance(value, models.Model) else value
+
+
+def _prepare_save(instances):
+    # Models that derive columns in save() expose that step as
+    # prepare_save(), returning the field names it sets.
+    fields = set()
+    for instance in instances:
+        prepare = getattr(instance, 'prepare_save', None)
+        if prepare is not None:
+            fields.update(prepare())
+    return fields
+
+
+def _locked_states(model, instances):
+    # counter_state() of each row as committed, locked for the rest of the
+    # transaction: the instances were loaded before it began, and a
+    # concurrent write may have moved them since.
+    if not hasattr(model, 'counter_state'):
+        return [getattr(instance, '_loaded_state', None) for instance in instances]
+    current = model._default_manager.select_for_update().in_bulk([instance.pk for instance in instances])
+    return [
+        current[instance.pk].counter_state() if instance.pk in current else getattr(instance, '_loaded_state', None)
+        for instance in instances
+    ]
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        self.matched_instances = []
+        self.matched_pks = set()
+        self.instances_by_pk = {instance.pk: instance for instance in self.instance or []}
+        preloaded = self._preload_related(data)
+        unique_checks = self._take_unique_validators()
+        try:
+            rows = super().to_internal_value(data)
+        finally:
+            for field in preloaded:
+                field.preloaded = None
+
+        errors = self._unique_errors(rows, unique_checks)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return rows
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return self.child.run_validation(data)
+
+        try:
+            key = self.child.Meta.model._meta.pk.to_python(data.get('id'))
+        except (AttributeError, DjangoValidationError):
+            key = None
+        instance = self.instances_by_pk.get(key)
+        if instance is None:
+            raise serializers.ValidationError({'id': ['Not found.']})
+        if instance.pk in self.matched_pks:
+            raise serializers.ValidationError({'id': ['Appears more than once in this batch.']})
+        self.child.instance = instance
+        self.child.initial_data = data
+        try:
+            attrs = self.child.run_validation(data)
+        finally:
+            self.child.instance = None
+        self.matched_instances.append(instance)
+        self.matched_pks.add(instance.pk)
+        return attrs
+
+    def _preload_related(self, data):
+        preloaded = []
+        for name, field in self.child.fields.items():
+            if field.read_only or not isinstance(field, PreloadedPrimaryKeyRelatedField):
+                continue
+            queryset = field.get_queryset()
+            keys = set()
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                if value is None or isinstance(value, (bool, dict, list)):
+                    continue
+                try:
+                    keys.add(queryset.model._meta.pk.to_python(value))
+                except DjangoValidationError:
+                    continue
+            field.preloaded = queryset.in_bulk(keys)
+            preloaded.append(field)
+        return preloaded
+
+    def _take_unique_validators(self):
+        # Uniqueness is checked once for the whole batch in _unique_errors;
+        # DRF's validators would query the table once per item.
+        checks = []
+        kept = []
+        for validator in self.child.validators:
+            if isinstance(validator, UniqueTogetherValidator):
+                sources = [self.child.fields[name].source for name in validator.fields]
+                checks.append((validator.queryset, sources, validator.condition, validator.message.format(
+                    field_names=', '.join(validator.fields),
+                ), api_settings.NON_FIELD_ERRORS_KEY))
+            else:
+                kept.append(validator)
+        self.child.validators = kept
+
+        for name, field in self.child.fields.items():
+            unique = [validator for validator in field.validators if isinstance(validator, UniqueValidator)]
+            if not unique:
+                continue
+            field.validators = [validator for validator in field.validators if validator not in unique]
+            for validator in unique:
+                checks.append((validator.queryset, [field.source], None, validator.message, name))
+        return checks
+
+    def _unique_errors(self, rows, checks):
+        errors = [{} for _ in rows]
+        instances = self.matched_instances if self.instance is not None else [None] * len(rows)
+        for queryset, sources, condition, message, error_key in checks:
+            keys = {}
+            for index, (attrs, instance) in enumerate(zip(rows, instances)):
+                state = {
+                    field.name: getattr(instance, field.attname) if instance else field.get_default()
+                    for field in queryset.model._meta.concrete_fields
+                }
+                state.update({name: _key_value(value) for name, value in attrs.items()})
+                if condition is not None:
+                    try:
+                        if not _condition_matches(condition, state):
+                            continue
+                    except _Unsupported:
+                        pass
+                key = tuple(state.get(source) for source in sources)
+                if None in key:
+                    continue
+                if key in keys:
+                    errors[index].setdefault(error_key, []).append(message)
+                    continue
+                keys[key] = index
+            if not keys:
+                continue
+
+            existing = queryset.filter(condition) if condition is not None else queryset
+            existing = existing.filter(**{
+                f'{source}__in': {key[position] for key in keys} for position, source in enumerate(sources)
+            })
+            updating = [instance.pk for instance in instances if instance is not None]
+            if updating:
+                existing = existing.exclude(pk__in=updating)
+            for key in existing.values_list(*sources):
+                if key in keys:
+                    errors[keys[key]].setdefault(error_key, []).append(message)
+        return errors
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        instances = [model(**attrs) for attrs in validated_data]
+        _prepare_save(instances)
+        instances = model._default_manager.bulk_create(instances)
+        bulk_saved.send(sender=model, instances=instances, previous=[None] * len(instances))
+        return instances
+
+    def update(self, instances, validated_data):
+        model = self.child.Meta.model
+        instances = self.matched_instances
+        previous = _locked_states(model, instances)
+        fields = set()
+        for instance, attrs in zip(instances, validated_data):
+            for name, value in attrs.items():
+                setattr(instance, name, value)
+            fields.update(attrs)
+        if fields:
+            fields.update(_prepare_save(instances))
+            # bulk_update() skips pre_save(), so auto_now columns are stamped here.
+            for field in model._meta.concrete_fields:
+                if getattr(field, 'auto_now', False):
+                    for instance in instances:
+                        field.pre_save(instance, add=False)
+                    fields.add(field.name)
+            model._default_manager.bulk_update(instances, list(fields))
+        bulk_saved.send(sender=model, instances=instances, previous=previous)
+        for instance in instances:
+            if hasattr(instance, 'counter_state'):
+                instance._loaded_state = instance.counter_state()
+            if hasattr(instance, 'slot_key'):
+                instance._loaded_slot = instance.slot_key()
+        return instances
+
+
+class BulkWriteViewSetMixin:
+    # POST a list to <prefix>/bulk/ to create, or PATCH a list of objects
+    # carrying their `id` to update. The whole batch is validated first,
+    # with per-item errors in request order, then written in one transaction.
+    bulk_conflict_message = BULK_CONFLICT_MESSAGE
+
+    @action(detail=False, methods=['post', 'patch'])
+    def bulk(self, request):
+        partial = request.method == 'PATCH'
+        instances = self.get_bulk_instances(request.data) if partial else None
+        serializer = self.get_serializer(
+            instances,
+            data=request.data,
+            many=True,
+            partial=partial,
+            allow_empty=False,
+            max_length=MAX_BULK_ITEMS,
+        )
+        serializer.is_valid(raise_exception=True)
+
+        using = router.db_for_write(serializer.child.Meta.model)
+        try:
+            with transaction.atomic(using=using):
+                if partial:
+                    self.perform_bulk_update(serializer)
+                else:
+                    self.perform_bulk_create(serializer)
+        except IntegrityError:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [self.bulk_conflict_message]})
+        return Response(serializer.data, status=status.HTTP_200_OK if partial else status.HTTP_201_CREATED)
+
+    def get_bulk_instances(self, data):
+        if not isinstance(data, list):
+            return []
+        pk_field = self.get_queryset().model._meta.pk
+        keys = set()
+        for item in data[:MAX_BULK_ITEMS]:
+            try:
+                keys.add(pk_field.to_python(item.get('id')))
+            except (AttributeError, DjangoValidationError):
+                continue
+        keys.discard(None)
+        return list(self.get_queryset().in_bulk(keys).values())
+
+    def perform_bulk_create(self, serializer):
+        serializer.save()
+
+    def perform_bulk_update(self, serializer):
+        serializer.save()
@@ -0,0 +1,87 @@
+import random
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+from .metrics import record_cache_lookups
+from .routers import primary_reads
+
+MISSING = object()
+LOCK_TIMEOUT = 30
+WAIT_INTERVAL = 0.05
+TTL_JITTER = 0.1
+
+
+def cache_get(key, default=None):
+    value = cache.get(key, MISSING)
+    record_cache_lookups(hits=value is not MISSING, misses=value is MISSING)
+    return default if value is MISSING else value
+
+
+def cache_get_many(keys):
+    found = cache.get_many(keys)
+    record_cache_lookups(hits=len(found), misses=len(keys) - len(found))
+    return found
+
+
+def jittered(ttl, jitter=TTL_JITTER):
+    # Spread expiries so keys written together do not all expire together.
+    return ttl * random.uniform(1 - jitter, 1 + jitter)
+
+
+@contextmanager
+def cache_lock(key, timeout=LOCK_TIMEOUT):
+    # cache.add() is atomic on Redis, so only one process across the
+    # deployment gets True; the lock expires on its own if the holder dies.
+    lock_key = f'lock:{key}'
+    acquired = cache.add(lock_key, 1, timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cache.delete(lock_key)
+
+
+def wait_for(read, timeout=LOCK_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = read()
+        if value is not MISSING:
+            return value
+        time.sleep(WAIT_INTERVAL)
+    return MISSING
+
+
+def _read_entry(key):
+    # Values are wrapped in an envelope so a cached None/0/[] is a hit.
+    entry = cache_get(key)
+    return MISSING if entry is None else entry
+
+
+def refresh_aggregate(key, compute, ttl=60, stale_ttl=300):
+    with primary_reads():
+        value = compute()
+    fresh_for = jittered(ttl)
+    entry = {'value': value, 'fresh_until': time.time() + fresh_for}
+    cache.set(key, entry, timeout=fresh_for + stale_ttl)
+    return value
+
+
+def cached_aggregate(key, compute, ttl=60, stale_ttl=300, lock_timeout=LOCK_TIMEOUT):
+    entry = _read_entry(key)
+    if entry is not MISSING and entry['fresh_until'] > time.time():
+        return entry['value']
+
+    with cache_lock(key, lock_timeout) as acquired:
+        if acquired:
+            return refresh_aggregate(key, compute, ttl, stale_ttl)
+
+    # Another process is recomputing: serve the stale value if there is one,
+    # otherwise wait for the winner instead of running the same query.
+    if entry is not MISSING:
+        return entry['value']
+    entry = wait_for(lambda: _read_entry(key), lock_timeout)
+    if entry is MISSING:
+        return refresh_aggregate(key, compute, ttl, stale_ttl)
+    return entry['value']
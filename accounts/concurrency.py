@@ -0,0 +1,39 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+QUERY_THREADS = int(os.getenv('QUERY_THREADS', '4'))
+
+# Django connections are thread-local, so each pool thread reads through its
+# own connection; at most QUERY_THREADS extra connections per process.
+_executor = ThreadPoolExecutor(max_workers=QUERY_THREADS, thread_name_prefix='hms-query')
+
+
+def _run_pooled(context, function):
+    # The caller's context carries the request metrics into the pool thread.
+    def run():
+        close_old_connections()
+        try:
+            return function()
+        finally:
+            close_old_connections()
+
+    return context.run(run)
+
+
+def _in_transaction(using):
+    # Another connection cannot see this one's uncommitted rows, and the
+    # caller may rely on them (e.g. tests, rolled-back benchmark requests).
+    return connections[using].in_atomic_block
+
+
+def run_queries(*functions, using=DEFAULT_DB_ALIAS):
+    # Run independent read-only callables concurrently, each on its own
+    # connection, and return their results in order.
+    if len(functions) < 2 or _in_transaction(using):
+        return [function() for function in functions]
+    futures = [_executor.submit(_run_pooled, contextvars.copy_context(), function) for function in functions]
+    return [future.result() for future in futures]
+
@@ -0,0 +1,70 @@
+import hashlib
+
+from django.contrib import messages
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def collection_validators(queryset, related=(), extra=()):
+    # Newest updated_at plus row count, for the rows and each one-to-one
+    # relation in `related`, in one aggregate query. The count catches
+    # deletes, which leave the newest timestamp unchanged.
+    aggregates = {'updated_at': Max('updated_at'), 'count': Count('pk')}
+    for path in related:
+        aggregates[f'{path}_updated_at'] = Max(f'{path}__updated_at')
+        aggregates[f'{path}_count'] = Count(f'{path}__pk')
+    state = queryset.order_by().aggregate(**aggregates)
+
+    digest = hashlib.md5(repr((sorted(state.items()), *extra)).encode(), usedforsecurity=False).hexdigest()
+    timestamps = [value for key, value in state.items() if key.endswith('updated_at') and value is not None]
+    return f'W/"{digest}"', max(timestamps, default=None)
+
+
+def not_modified(request, etag):
+    # Last-Modified is sent for information only: a delete does not move it,
+    # so revalidation is decided by the ETag alone.
+    return get_conditional_response(request, etag=etag)
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def portal_not_modified(request, etag):
+    # Flash messages are part of the page; render it so they are shown.
+    if len(messages.get_messages(request)):
+        return None
+    return not_modified(request, etag)
+
+
+class ConditionalGetViewSetMixin:
+    # list/retrieve answer If-None-Match with 304 after one aggregate query
+    # over the same (user-scoped, filtered) queryset they would serialize.
+    conditional_related = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def conditional_response(self, request, view, *args, **kwargs):
+        etag, last_modified = collection_validators(
+            self.get_conditional_queryset(),
+            related=self.conditional_related,
+            extra=(request.user.pk, request.get_full_path(), request.accepted_renderer.format),
+        )
+        response = not_modified(request, etag) or view(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
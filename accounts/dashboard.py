@@ -0,0 +1,143 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from appointments.models import Appointment
+from billing.models import Invoice
+
+from .caching import MISSING, cache_get_many, cache_lock, wait_for
+from .concurrency import run_queries
+from .routers import primary_reads
+from .models import Doctor, Patient
+
+KEY_PREFIX = 'dashboard'
+APPOINTMENT_STATUSES = [status for status, _ in Appointment.STATUS_CHOICES]
+STAT_NAMES = (
+    ['doctors', 'patients']
+    + [f'appointments:{status}' for status in APPOINTMENT_STATUSES]
+    + ['revenue_cents', 'paid_invoices', 'unpaid_invoices']
+)
+
+
+def _key(name):
+    return f'{KEY_PREFIX}:{name}'
+
+
+def to_cents(amount):
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+def compute_stats():
+    # Four independent scans; run_queries issues them side by side.
+    appointment_counts, invoice_totals, doctors, patients = run_queries(
+        lambda: dict(Appointment.objects.order_by().values_list('status').annotate(total=Count('id'))),
+        lambda: Invoice.objects.aggregate(
+            paid_total=Sum('amount', filter=Q(paid=True)),
+            paid_count=Count('id', filter=Q(paid=True)),
+            unpaid_count=Count('id', filter=Q(paid=False)),
+        ),
+        Doctor.objects.count,
+        Patient.objects.count,
+    )
+    stats = {
+        'doctors': doctors,
+        'patients': patients,
+        'revenue_cents': to_cents(invoice_totals['paid_total'] or 0),
+        'paid_invoices': invoice_totals['paid_count'],
+        'unpaid_invoices': invoice_totals['unpaid_count'],
+    }
+    for status in APPOINTMENT_STATUSES:
+        stats[f'appointments:{status}'] = appointment_counts.get(status, 0)
+    return stats
+
+
+def reconcile_stats():
+    with primary_reads():
+        stats = compute_stats()
+    cache.set_many({_key(name): value for name, value in stats.items()}, timeout=None)
+    return stats
+
+
+def _read_counters():
+    cached = cache_get_many([_key(name) for name in STAT_NAMES])
+    if len(cached) != len(STAT_NAMES):
+        return MISSING
+    return {name: cached[_key(name)] for name in STAT_NAMES}
+
+
+def get_stats():
+    stats = _read_counters()
+    if stats is not MISSING:
+        return stats
+
+    # Only one process reseeds the counters; the rest wait for its result.
+    with cache_lock(_key('reconcile')) as acquired:
+        if acquired:
+            return reconcile_stats()
+    stats = wait_for(_read_counters)
+    return reconcile_stats() if stats is MISSING else stats
+
+
+def dashboard_payload(stats):
+    return {
+        'users': {
+            'doctors': stats['doctors'],
+            'patients': stats['patients'],
+        },
+        'appointments_by_status': [
+            {'status': status, 'total': stats[f'appointments:{status}']}
+            for status in APPOINTMENT_STATUSES
+            if stats[f'appointments:{status}']
+        ],
+        'revenue': Decimal(stats['revenue_cents']) / 100,
+        'paid_invoices': stats['paid_invoices'],
+        'unpaid_invoices': stats['unpaid_invoices'],
+    }
+
+
+def _apply(deltas):
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(_key(name), delta)
+        except ValueError:
+            # A counter was evicted or never seeded; rebuild the whole set
+            # from the database, which already includes this change.
+            with cache_lock(_key('reconcile')) as acquired:
+                if acquired:
+                    reconcile_stats()
+            return
+
+
+def record_stats_change(**deltas):
+    # Counters only move once the write is durable, so a rolled-back
+    # transaction never leaves the dashboard ahead of the database.
+    transaction.on_commit(lambda: _apply(deltas))
+
+
+def appointment_deltas(previous_status, current_status):
+    deltas = {}
+    if previous_status:
+        deltas[f'appointments:{previous_status}'] = -1
+    if current_status:
+        key = f'appointments:{current_status}'
+        deltas[key] = deltas.get(key, 0) + 1
+    return deltas
+
+
+def invoice_deltas(previous, current):
+    # previous/current are Invoice.counter_state() tuples of (paid, amount).
+    deltas = {'revenue_cents': 0, 'paid_invoices': 0, 'unpaid_invoices': 0}
+    for state, sign in ((previous, -1), (current, 1)):
+        if state is None:
+            continue
+        paid, amount = state
+        if paid:
+            deltas['paid_invoices'] += sign
+            deltas['revenue_cents'] += sign * to_cents(amount)
+        else:
+            deltas['unpaid_invoices'] += sign
+    return deltas
@@ -0,0 +1,154 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from appointments.models import Appointment
+from billing.models import Invoice
+from prescriptions.models import Prescription
+
+EXPORT_CHUNK_SIZE = 2000
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Each dataset is read with values_list() so rows stream out as tuples and
+# no model instances are built. `date_field` drives ?start=/?end= and
+# `paid_field` drives ?paid=.
+EXPORT_DATASETS = {
+    'invoices': {
+        'queryset': lambda: Invoice.objects.all(),
+        'ordering': ('-issued_at', '-id'),
+        'date_field': 'issued_at',
+        'paid_field': 'paid',
+        'columns': (
+            ('invoice_id', 'id'),
+            ('issued_at', 'issued_at'),
+            ('amount', 'amount'),
+            ('paid', 'paid'),
+            ('appointment_id', 'appointment_id'),
+            ('appointment_date', 'appointment__date'),
+            ('patient_email', 'appointment__patient__user__email'),
+            ('doctor_email', 'appointment__doctor__user__email'),
+            ('specialization', 'appointment__doctor__specialization'),
+        ),
+    },
+    'appointments': {
+        'queryset': lambda: Appointment.objects.all(),
+        'ordering': ('-date', '-time', '-id'),
+        'date_field': 'date',
+        'paid_field': 'invoice__paid',
+        'columns': (
+            ('appointment_id', 'id'),
+            ('date', 'date'),
+            ('time', 'time'),
+            ('status', 'status'),
+            ('reason', 'reason'),
+            ('patient_email', 'patient__user__email'),
+            ('doctor_email', 'doctor__user__email'),
+            ('invoice_amount', 'invoice__amount'),
+            ('invoice_paid', 'invoice__paid'),
+        ),
+    },
+    'prescriptions': {
+        'queryset': lambda: Prescription.objects.all(),
+        'ordering': ('-created_at', '-id'),
+        'date_field': 'created_at',
+        'paid_field': 'appointment__invoice__paid',
+        'columns': (
+            ('prescription_id', 'id'),
+            ('created_at', 'created_at'),
+            ('appointment_id', 'appointment_id'),
+            ('appointment_date', 'appointment__date'),
+            ('patient_email', 'appointment__patient__user__email'),
+            ('doctor_email', 'appointment__doctor__user__email'),
+            ('diagnosis', 'diagnosis'),
+            ('medicines', 'medicines'),
+            ('notes', 'notes'),
+        ),
+    },
+}
+
+
+class ExportFilterError(ValueError):
+    pass
+
+
+def _parse_day(value, name):
+    day = parse_date(value) if value else None
+    if value and day is None:
+        raise ExportFilterError(f'{name} must be a date in YYYY-MM-DD format.')
+    return day
+
+
+def _day_bound(model, field_name, day):
+    # DateTimeFields are compared against local midnight rather than with
+    # __date, which would wrap the column in a cast and skip its index.
+    if model._meta.get_field(field_name).get_internal_type() != 'DateTimeField':
+        return day
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def export_queryset(dataset, params):
+    config = EXPORT_DATASETS[dataset]
+    queryset = config['queryset']()
+    date_field = config['date_field']
+
+    start = _parse_day(params.get('start'), 'start')
+    end = _parse_day(params.get('end'), 'end')
+    if start and end and end < start:
+        raise ExportFilterError('end must not be before start.')
+    if start:
+        queryset = queryset.filter(**{f'{date_field}__gte': _day_bound(queryset.model, date_field, start)})
+    if end:
+        queryset = queryset.filter(**{f'{date_field}__lt': _day_bound(queryset.model, date_field, end + timedelta(days=1))})
+
+    paid = params.get('paid')
+    if paid:
+        if paid not in ('true', 'false'):
+            raise ExportFilterError('paid must be true or false.')
+        queryset = queryset.filter(**{config['paid_field']: paid == 'true'})
+
+    return queryset.order_by(*config['ordering']).values_list(*[source for _, source in config['columns']])
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # Free text (reasons, diagnoses, notes, names) is written by patients
+    # and doctors; a leading quote stops a spreadsheet from running it as a
+    # formula.
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def stream_csv(dataset, rows):
+    writer = csv.writer(_Echo())
+    # The header goes out before the query runs, so the client sees the
+    # first byte immediately even for a large export.
+    yield writer.writerow([name for name, _ in EXPORT_DATASETS[dataset]['columns']])
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def stream_ndjson(dataset, rows):
+    names = [name for name, _ in EXPORT_DATASETS[dataset]['columns']]
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+EXPORT_WRITERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+}
@@ -0,0 +1,64 @@
+from rest_framework.serializers import BaseSerializer
+
+FIELDS_QUERY_PARAM = 'fields'
+
+
+def requested_fields(request):
+    # `?fields=id,date,status` on safe requests; writes always use every field.
+    if request is None or request.method != 'GET':
+        return None
+    raw = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(',') if name.strip()}
+
+
+def _select_related_paths(tree, prefix=''):
+    for name, children in tree.items():
+        path = f'{prefix}{name}'
+        if children:
+            yield from _select_related_paths(children, f'{path}__')
+        else:
+            yield path
+
+
+def narrow_queryset(queryset, serializer):
+    # Load only the columns behind the serializer's remaining fields, and
+    # drop joins that no remaining nested serializer needs.
+    concrete = {field.name for field in queryset.model._meta.concrete_fields}
+    columns = {queryset.model._meta.pk.name}
+    nested = set()
+    for field in serializer.fields.values():
+        root = field.source.split('.')[0]
+        if root not in concrete:
+            # '*', properties and method sources could read any column.
+            return queryset
+        columns.add(root)
+        if isinstance(field, BaseSerializer):
+            nested.add(root)
+
+    select_related = queryset.query.select_related
+    if select_related:
+        paths = [] if select_related is True else list(_select_related_paths(select_related))
+        queryset = queryset.select_related(None)
+        kept = [path for path in paths if path.split('__')[0] in nested]
+        if kept:
+            queryset = queryset.select_related(*kept)
+    return queryset.only(*columns)
+
+
+class SparseFieldsetSerializerMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
+class SparseFieldsetViewSetMixin:
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if requested_fields(self.request) and self.action in ('list', 'retrieve'):
+            queryset = narrow_queryset(queryset, self.get_serializer())
+        return queryset
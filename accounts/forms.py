@@ -1,8 +1,10 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.db.models.functions import Lower
 
 from .models import ContactQuery, Doctor
 from appointments.models import Appointment
+from appointments.slots import is_slot_available
 
 User = get_user_model()
 
@@ -15,7 +17,8 @@ class BaseRegisterForm(forms.Form):
 
     def clean_email(self):
         email = self.cleaned_data.get('email')
-        if User.objects.filter(email__iexact=email).exists() or User.objects.filter(username__iexact=email).exists():
+        users = User.objects.alias(email_lower=Lower('email'), username_lower=Lower('username'))
+        if users.filter(email_lower=email.lower()).exists() or users.filter(username_lower=email.lower()).exists():
             raise forms.ValidationError('A user with this email already exists.')
         return email
 
@@ -103,3 +106,12 @@ class AppointmentBookForm(forms.ModelForm):
         labels = {
             'reason': 'Describe Your Problem',
         }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        doctor = cleaned_data.get('doctor')
+        day = cleaned_data.get('date')
+        at = cleaned_data.get('time')
+        if doctor and day and at and not is_slot_available(doctor, day, at):
+            self.add_error('time', 'This time is not a free slot for the selected doctor. Please pick one of the available slots.')
+        return cleaned_data
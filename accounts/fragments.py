@@ -0,0 +1,54 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .caching import cache_get, cache_get_many, jittered
+from .routers import primary_reads
+
+FRAGMENT_TTL = 60 * 60
+# Fragments are shared by every session that can see them, so forms are
+# rendered with this marker and the visitor's own token is swapped in on
+# the way out.
+CSRF_PLACEHOLDER = 'csrf-token-placeholder'
+
+
+def _version_key(scope):
+    return f'fragments:version:{scope}'
+
+
+def fragment_versions(*scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    found = cache_get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump_fragment_versions(*scopes):
+    # Bumped after commit so a reader that sees the new version also sees
+    # the new rows; fragments keyed by the old version simply age out.
+    keys = {_version_key(scope) for scope in scopes}
+    if keys:
+        transaction.on_commit(lambda: cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None))
+
+
+def render_fragment(template_name, context):
+    return render_to_string(template_name, {**context, 'csrf_token': CSRF_PLACEHOLDER})
+
+
+def cached_fragment(request, name, scopes, render, ttl=FRAGMENT_TTL):
+    key = ':'.join(['fragments', name, *fragment_versions(*scopes)])
+    content = cache_get(key)
+    if content is None:
+        # Rendered from the primary: the version may have been bumped for a
+        # write the replicas have not applied yet.
+        with primary_reads():
+            content = render()
+        cache.set(key, content, jittered(ttl))
+    return mark_safe(content.replace(CSRF_PLACEHOLDER, get_token(request)))
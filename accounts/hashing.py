@@ -0,0 +1,14 @@
+import django
+from django.contrib.auth.hashers import make_password
+
+# Process-pool entry points for `import_users`. Kept apart from modules that
+# import models: a spawned worker unpickles these by importing this module
+# before Django is set up.
+
+
+def init_worker():
+    django.setup()
+
+
+def hash_password(raw_password):
+    return make_password(raw_password)
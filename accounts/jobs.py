@@ -0,0 +1,213 @@
+import logging
+import os
+import socket
+import tempfile
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from appointments.models import Appointment
+from billing.aggregates import refresh_invoice_totals
+from billing.rollups import refresh_revenue_rollups
+
+from .approvals import rejected_doctors
+from .dashboard import reconcile_stats
+from .exports import EXPORT_CHUNK_SIZE, EXPORT_WRITERS, export_queryset
+from .models import Job, User
+
+logger = logging.getLogger(__name__)
+
+JOB_BATCH_SIZE = 500
+JOB_HANDLERS = {}
+
+
+def job_handler(kind):
+    def register(function):
+        JOB_HANDLERS[kind] = function
+        return function
+    return register
+
+
+def enqueue(kind, payload=None, user=None):
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    return Job.objects.create(kind=kind, payload=payload or {}, created_by=user, max_attempts=settings.JOB_MAX_ATTEMPTS)
+
+
+def enqueue_once(kind, payload=None):
+    # For system jobs that only need to run once more after a burst of
+    # writes: a job of the kind that is still queued will see them all.
+    if Job.objects.filter(kind=kind, status='QUEUED').exists():
+        return None
+    return enqueue(kind, payload)
+
+
+def worker_name(index=0):
+    return f'{socket.gethostname()}:{os.getpid()}:{index}'
+
+
+def report_progress(job, done, total, message=''):
+    job.progress = min(100, done * 100 // total) if total else 0
+    job.progress_message = message[:200]
+    Job.objects.filter(pk=job.pk, worker=job.worker).update(
+        progress=job.progress, progress_message=job.progress_message, heartbeat_at=timezone.now()
+    )
+
+
+def _claimable():
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    # Queued jobs first; then running jobs whose worker stopped heartbeating.
+    yield Job.objects.filter(status='QUEUED', run_after__lte=now).order_by('run_after', 'id')
+    yield Job.objects.filter(status='RUNNING', heartbeat_at__lt=stale).order_by('heartbeat_at', 'id')
+
+
+def claim_job(worker):
+    for candidates in _claimable():
+        with transaction.atomic():
+            # SKIP LOCKED lets workers claim side by side without waiting on
+            # each other's rows; the guarded update covers backends without
+            # row locks (SQLite).
+            job = candidates.select_for_update(skip_locked=True).first()
+            if job is None:
+                continue
+            now = timezone.now()
+            claimed = Job.objects.filter(pk=job.pk, status=job.status, attempts=job.attempts).update(
+                status='RUNNING', attempts=job.attempts + 1, worker=worker, started_at=now, heartbeat_at=now
+            )
+        if claimed:
+            job.status, job.attempts, job.worker, job.started_at, job.heartbeat_at = 'RUNNING', job.attempts + 1, worker, now, now
+            return job
+    return None
+
+
+def _finish(job, **fields):
+    # Guarded by worker and attempt: a job reclaimed from this worker after
+    # a missed heartbeat now belongs to someone else.
+    Job.objects.filter(pk=job.pk, worker=job.worker, attempts=job.attempts).update(**fields)
+    for name, value in fields.items():
+        setattr(job, name, value)
+
+
+class _Heartbeat(threading.Thread):
+    def __init__(self, job):
+        super().__init__(daemon=True, name=f'hms-job-heartbeat-{job.pk}')
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(settings.JOB_LEASE_SECONDS / 3):
+                Job.objects.filter(pk=self.job.pk, worker=self.job.worker).update(heartbeat_at=timezone.now())
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job):
+    if job.attempts > job.max_attempts:
+        _finish(job, status='FAILED', error='Worker lost while running the final attempt.', finished_at=timezone.now())
+        return job
+    handler = JOB_HANDLERS.get(job.kind)
+    heartbeat = _Heartbeat(job)
+    heartbeat.start()
+    try:
+        if handler is None:
+            raise LookupError(f'No handler for job kind {job.kind!r}.')
+        result = handler(job, **job.payload)
+    except Exception:
+        logger.exception('Job %s (%s) failed on attempt %d.', job.pk, job.kind, job.attempts)
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            delay = settings.JOB_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+            _finish(job, status='QUEUED', error=traceback.format_exc(), run_after=now + timedelta(seconds=delay), heartbeat_at=None)
+        else:
+            _finish(job, status='FAILED', error=traceback.format_exc(), finished_at=now)
+    else:
+        _finish(job, status='SUCCEEDED', result=result, error='', progress=100, finished_at=timezone.now())
+    finally:
+        heartbeat.stop()
+    return job
+
+
+def work(worker, stop, poll_interval=1.0, burst=False):
+    # One worker loop; `burst` returns once the queue is empty.
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            job = claim_job(worker)
+            if job is None:
+                if burst:
+                    return
+                stop.wait(poll_interval)
+                continue
+            run_job(job)
+    finally:
+        connection.close()
+
+
+@job_handler('reconcile_dashboard')
+def reconcile_dashboard(job):
+    return reconcile_stats()
+
+
+@job_handler('refresh_billing')
+def refresh_billing(job):
+    report_progress(job, 0, 2, 'Refreshing revenue rollups')
+    days = refresh_revenue_rollups()
+    report_progress(job, 1, 2, 'Recomputing invoice totals')
+    totals = refresh_invoice_totals()
+    return {**totals, 'rollup_days': days}
+
+
+@job_handler('refresh_revenue_rollups')
+def refresh_rollups(job):
+    return {'rollup_days': refresh_revenue_rollups()}
+
+
+@job_handler('reject_doctors')
+def reject_doctors(job, doctor_ids):
+    # Deletes the doctors' appointments (with their invoices and
+    # prescriptions) in short transactions, then the accounts themselves.
+    # Only doctors still rejected and inactive are touched.
+    doctors = list(rejected_doctors(doctor_ids).values_list('pk', 'user_id'))
+    appointments = Appointment.objects.filter(doctor_id__in=[pk for pk, _ in doctors]).order_by('pk')
+    total = appointments.count()
+    deleted = 0
+    while True:
+        batch = list(appointments.values_list('pk', flat=True)[:JOB_BATCH_SIZE])
+        if not batch:
+            break
+        with transaction.atomic():
+            Appointment.objects.filter(pk__in=batch).delete()
+        deleted += len(batch)
+        report_progress(job, deleted, total + 1, f'Deleted {deleted} of {total} appointments')
+    User.objects.filter(pk__in=[user_id for _, user_id in doctors]).delete()
+    return {'doctors': len(doctors), 'appointments': deleted}
+
+
+@job_handler('export')
+def export_dataset(job, dataset, fmt, filters):
+    rows = export_queryset(dataset, filters)
+    total = rows.count()
+    lines = total + 1 if fmt == 'csv' else total
+    written = 0
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as handle:
+        for chunk in EXPORT_WRITERS[fmt](dataset, rows):
+            handle.write(chunk.encode())
+            written += 1
+            if written % EXPORT_CHUNK_SIZE == 0:
+                report_progress(job, written, lines, f'Wrote {written} of {lines} lines')
+        size = handle.tell()
+        handle.seek(0)
+        name = default_storage.save(f'exports/{job.pk}-{dataset}-{timezone.localdate().isoformat()}.{fmt}', File(handle))
+    return {'file': name, 'rows': total, 'size': size}
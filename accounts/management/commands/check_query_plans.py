@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.functions import Lower
+
+from accounts.models import ContactQuery, Doctor, User
+from appointments.models import Appointment
+from billing.models import Invoice
+
+SUPPORTED_VENDORS = ('sqlite', 'postgresql')
+
+
+def query_shapes():
+    # (description, queryset, index the planner is expected to pick)
+    return [
+        ('doctor portal appointments', Appointment.objects.filter(doctor_id=1), 'appt_doctor_date_idx'),
+        ('doctor appointments by status', Appointment.objects.filter(doctor_id=1, status='SCHEDULED'), 'appt_doctor_status_date_idx'),
+        ('patient portal appointments', Appointment.objects.filter(patient_id=1), 'appt_patient_date_idx'),
+        ('patient appointments by status', Appointment.objects.filter(patient_id=1, status='SCHEDULED'), 'appt_patient_status_date_idx'),
+        ('appointment list', Appointment.objects.all(), 'appt_date_time_idx'),
+        ('paid invoices', Invoice.objects.filter(paid=True).order_by('-issued_at'), 'invoice_paid_idx'),
+        ('unpaid invoices', Invoice.objects.filter(paid=False).order_by('-issued_at'), 'invoice_unpaid_idx'),
+        ('login email lookup', User.objects.alias(email_lower=Lower('email')).filter(email_lower='someone@example.com'), 'user_email_lower_idx'),
+        ('registration username lookup', User.objects.alias(username_lower=Lower('username')).filter(username_lower='someone@example.com'), 'user_username_lower_idx'),
+        ('pending doctors', Doctor.objects.filter(user__role='DOCTOR', user__is_active=False, rejected_at__isnull=True), 'user_pending_doctor_idx'),
+        ('contact queries', ContactQuery.objects.all(), 'contactquery_created_idx'),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the hot portal/API query shapes and fail if any of them does not use its index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        connection = connections[using]
+        if connection.vendor not in SUPPORTED_VENDORS:
+            raise CommandError(f'Query plan checks support {", ".join(SUPPORTED_VENDORS)}, not {connection.vendor}.')
+
+        failures = []
+        for description, queryset, index_name in query_shapes():
+            plan = self.explain(connection, queryset.using(using))
+            ok = index_name in plan
+            if not ok:
+                failures.append(description)
+            self.stdout.write(f"{'OK  ' if ok else 'FAIL'} {description} ({index_name})")
+            if options['verbosity'] > 1 or not ok:
+                self.stdout.write(f'     {plan}'.replace('\n', '\n     '))
+
+        if failures:
+            raise CommandError(f"{len(failures)} query shape(s) are not using their index: {', '.join(failures)}")
+
+    def explain(self, connection, queryset):
+        if connection.vendor != 'postgresql':
+            return queryset.explain()
+        # On small tables PostgreSQL rightly prefers a sequential scan, so
+        # disable it for this transaction to ask whether the index is usable.
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
@@ -0,0 +1,239 @@
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.dateparse import parse_date
+
+from accounts.bulk import bulk_saved
+from accounts.hashing import hash_password, init_worker
+from accounts.models import Doctor, Patient, Specialization, User, normalize_specialization
+
+ROLES = ('PATIENT', 'DOCTOR')
+
+
+class RowError(ValueError):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Import doctors and patients from a CSV file. Columns: email, full_name (or first_name/last_name), '
+        'password, role, dob, age, gender, contact_number, specialization, license_number, is_active.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--role', choices=ROLES, help='Role for rows without a role column.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Password hashing processes.')
+        parser.add_argument(
+            '--unusable-passwords',
+            action='store_true',
+            help='Skip hashing and mark every password unusable (users set one via password reset).',
+        )
+        parser.add_argument('--resume', action='store_true', help='Skip the rows recorded in the progress file.')
+        parser.add_argument('--progress-file', help='Defaults to <csv_path>.progress.')
+
+    def handle(self, *args, **options):
+        csv_path = options['csv_path']
+        chunk_size = max(1, options['chunk_size'])
+        progress_path = options['progress_file'] or f'{csv_path}.progress'
+        done = self.read_progress(progress_path) if options['resume'] else 0
+        self.default_role = options['role']
+        self.unusable = options['unusable_passwords']
+
+        totals = {'created': 0, 'duplicates': 0, 'invalid': 0}
+        executor = None
+        if not self.unusable and options['workers'] > 1:
+            # Workers are spawned, not forked: ProcessPoolExecutor starts them
+            # lazily on the first submit(), when this process already holds
+            # database connections that a forked child would share.
+            executor = ProcessPoolExecutor(
+                max_workers=options['workers'], mp_context=multiprocessing.get_context('spawn'), initializer=init_worker
+            )
+
+        try:
+            with open(csv_path, newline='', encoding='utf-8-sig') as handle:
+                reader = csv.DictReader(handle)
+                if 'email' not in (reader.fieldnames or []):
+                    raise CommandError('CSV file must have an "email" column.')
+                rows = islice(reader, done, None)
+                if done:
+                    self.stdout.write(f'Resuming after row {done}.')
+
+                while chunk := list(islice(rows, chunk_size)):
+                    counts = self.import_chunk(chunk, first_row=done + 2, executor=executor)
+                    done += len(chunk)
+                    self.write_progress(progress_path, done)
+                    for key, value in counts.items():
+                        totals[key] += value
+                    self.stdout.write(
+                        f"{done} rows processed: {counts['created']} created, "
+                        f"{counts['duplicates']} duplicates, {counts['invalid']} invalid"
+                    )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {totals['created']} users ({totals['duplicates']} duplicates, {totals['invalid']} invalid)."
+        ))
+
+    def read_progress(self, path):
+        try:
+            with open(path) as handle:
+                return int(handle.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            raise CommandError(f'Progress file {path} is corrupt; delete it to start over.')
+
+    def write_progress(self, path, done):
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as handle:
+            handle.write(str(done))
+        os.replace(temp_path, path)
+
+    def parse_row(self, row):
+        email = (row.get('email') or '').strip()
+        if not email or '@' not in email:
+            raise RowError('missing or invalid email')
+        role = (row.get('role') or self.default_role or '').strip().upper()
+        if role not in ROLES:
+            raise RowError('role must be PATIENT or DOCTOR')
+
+        first_name = (row.get('first_name') or '').strip()
+        last_name = (row.get('last_name') or '').strip()
+        full_name = (row.get('full_name') or '').strip()
+        if full_name and not (first_name or last_name):
+            first_name, _, last_name = full_name.partition(' ')
+
+        parsed = {
+            'email': email,
+            'role': role,
+            'first_name': first_name,
+            'last_name': last_name.strip(),
+            'password': row.get('password') or None,
+            'is_active': (row.get('is_active') or 'true').strip().lower() not in ('0', 'false', 'no'),
+        }
+        if role == 'DOCTOR':
+            parsed['specialization'] = normalize_specialization(row.get('specialization') or '')
+            parsed['license_number'] = (row.get('license_number') or '').strip()
+            if not parsed['specialization'] or not parsed['license_number']:
+                raise RowError('doctors need specialization and license_number')
+        else:
+            dob = (row.get('dob') or '').strip()
+            age = (row.get('age') or '').strip()
+            try:
+                parsed['dob'] = parse_date(dob) if dob else None
+            except ValueError:
+                parsed['dob'] = None
+            if dob and parsed['dob'] is None:
+                raise RowError('dob must be YYYY-MM-DD')
+            if age and not age.isdigit():
+                raise RowError('age must be a whole number')
+            parsed['age'] = int(age) if age else None
+            parsed['gender'] = (row.get('gender') or '').strip()
+            parsed['contact_number'] = (row.get('contact_number') or '').strip()
+        return parsed
+
+    def import_chunk(self, chunk, first_row, executor):
+        counts = {'created': 0, 'duplicates': 0, 'invalid': 0}
+        parsed = []
+        for line, row in enumerate(chunk, start=first_row):
+            try:
+                parsed.append(self.parse_row(row))
+            except RowError as exc:
+                counts['invalid'] += 1
+                self.stderr.write(f'Row {line}: {exc}')
+
+        # One set-based lookup per chunk for each unique column, plus
+        # duplicates within the chunk itself.
+        emails = {item['email'].lower() for item in parsed}
+        taken_emails = set()
+        for email, username in (
+            User.objects.alias(email_lower=Lower('email'), username_lower=Lower('username'))
+            .filter(Q(email_lower__in=emails) | Q(username_lower__in=emails))
+            .values_list(Lower('email'), Lower('username'))
+        ):
+            taken_emails.update((email, username))
+        licenses = {item['license_number'] for item in parsed if item['role'] == 'DOCTOR'}
+        taken_licenses = set(Doctor.objects.filter(license_number__in=licenses).values_list('license_number', flat=True))
+
+        fresh = []
+        for item in parsed:
+            email = item['email'].lower()
+            license_number = item.get('license_number')
+            if email in taken_emails or (license_number and license_number in taken_licenses):
+                counts['duplicates'] += 1
+                continue
+            taken_emails.add(email)
+            if license_number:
+                taken_licenses.add(license_number)
+            fresh.append(item)
+        if not fresh:
+            return counts
+
+        passwords = [None if self.unusable else item['password'] for item in fresh]
+        to_hash = [password for password in passwords if password]
+        if executor is not None and to_hash:
+            hashed = iter(executor.map(hash_password, to_hash, chunksize=max(1, len(to_hash) // 64)))
+        else:
+            hashed = iter([hash_password(password) for password in to_hash])
+        hashes = [next(hashed) if password else make_password(None) for password in passwords]
+
+        users = [
+            User(
+                username=item['email'],
+                email=item['email'],
+                first_name=item['first_name'],
+                last_name=item['last_name'],
+                role=item['role'],
+                is_active=item['is_active'],
+                password=password_hash,
+            )
+            for item, password_hash in zip(fresh, hashes)
+        ]
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            specialties = {
+                name.lower(): Specialization.for_name(name)
+                for name in {item['specialization'] for item in fresh if item['role'] == 'DOCTOR'}
+            }
+            doctors = [
+                Doctor(
+                    user=user,
+                    specialization=item['specialization'],
+                    specialty=specialties[item['specialization'].lower()],
+                    license_number=item['license_number'],
+                )
+                for item, user in zip(fresh, users)
+                if item['role'] == 'DOCTOR'
+            ]
+            patients = [
+                Patient(
+                    user=user,
+                    dob=item['dob'],
+                    age=item['age'],
+                    gender=item['gender'],
+                    contact_number=item['contact_number'],
+                )
+                for item, user in zip(fresh, users)
+                if item['role'] == 'PATIENT'
+            ]
+            Doctor.objects.bulk_create(doctors)
+            Patient.objects.bulk_create(patients)
+            for model, instances in ((Doctor, doctors), (Patient, patients)):
+                if instances:
+                    bulk_saved.send(sender=model, instances=instances, previous=[None] * len(instances))
+
+        counts['created'] = len(users)
+        return counts
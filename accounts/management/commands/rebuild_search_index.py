@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from accounts.search import install_search_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-create the full-text search indexes and re-index every row. Run it on SQLite after a '
+        'migration rebuilds the contact query or prescription table, which drops its triggers.'
+    )
+
+    def handle(self, *args, **options):
+        with connection.schema_editor() as schema_editor:
+            install_search_indexes(schema_editor)
+        self.stdout.write('Search indexes rebuilt.')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from accounts.dashboard import get_stats, reconcile_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the cached dashboard counters from the database (run periodically, e.g. from cron).'
+
+    def handle(self, *args, **options):
+        cached = get_stats()
+        stats = reconcile_stats()
+        drifted = [name for name, value in stats.items() if cached.get(name) != value]
+        if drifted:
+            self.stdout.write(f"Corrected drift in: {', '.join(drifted)}")
+        else:
+            self.stdout.write('Dashboard counters are in sync.')
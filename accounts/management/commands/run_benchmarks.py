@@ -0,0 +1,179 @@
+import json
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Doctor, Patient, User
+from appointments.models import Appointment
+from appointments.slots import free_slots
+
+LATENCY_FLOOR_MS = 1.0
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive every portal view and REST endpoint through the test client and report p50/p95/p99 latency, '
+        'query counts and peak memory. Run seed_hms first. With --baseline, fail on regressions.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--only', help='Run scenarios whose name contains this text.')
+        parser.add_argument('--baseline', help='JSON file to compare against (and write with --save-baseline).')
+        parser.add_argument('--save-baseline', action='store_true')
+        parser.add_argument('--threshold', type=float, default=0.25, help='Allowed p95 latency/memory growth, e.g. 0.25 = 25%%.')
+
+    def handle(self, *args, **options):
+        scenarios = self.build_scenarios()
+        if options['only']:
+            scenarios = [scenario for scenario in scenarios if options['only'] in scenario[0]]
+
+        results = {}
+        for name, client, method, path, data in scenarios:
+            results[name] = self.measure(client, method, path, data, options['iterations'], options['warmup'])
+            self.report(name, results[name])
+
+        if options['baseline'] and options['save_baseline']:
+            Path(options['baseline']).write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(f"Baseline written to {options['baseline']}.")
+        elif options['baseline']:
+            self.compare(results, json.loads(Path(options['baseline']).read_text()), options['threshold'])
+
+    def build_scenarios(self):
+        admin = User.objects.filter(role='ADMIN', is_active=True).order_by('id').first()
+        doctor = Doctor.objects.select_related('user').filter(user__is_active=True).order_by('id').first()
+        patient = Patient.objects.select_related('user').filter(user__is_active=True).order_by('id').first()
+        appointment = Appointment.objects.order_by('-id').first()
+        if not (admin and doctor and patient and appointment):
+            raise CommandError('Benchmarks need an admin, a doctor, a patient and appointments; run seed_hms first.')
+
+        portal = {}
+        for role, user in (('admin', admin), ('doctor', doctor.user), ('patient', patient.user)):
+            portal[role] = Client()
+            portal[role].force_login(user)
+        api = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+
+        start = timezone.localdate() + timedelta(days=1)
+        booking = None
+        for day, times in free_slots(doctor, start, start + timedelta(days=14)).items():
+            if times:
+                booking = {'doctor': doctor.pk, 'date': day.isoformat(), 'time': times[0].strftime('%H:%M'), 'reason': 'Benchmark'}
+                break
+
+        scenarios = [
+            ('portal:admin', portal['admin'], 'get', '/admin/', None),
+            *[
+                (f'portal:admin-section:{section}', portal['admin'], 'get', f'/admin/sections/{section}/', None)
+                for section in ('pending_doctors', 'doctors', 'patients', 'appointments', 'queries')
+            ],
+            ('portal:admin-billing-history', portal['admin'], 'get', '/admin/billing-history/', None),
+            ('portal:doctor', portal['doctor'], 'get', '/doctor/', None),
+            ('portal:doctor-billing', portal['doctor'], 'get', '/doctor/billing/', None),
+            ('portal:patient', portal['patient'], 'get', '/patient/', None),
+            ('portal:book-appointment', portal['patient'], 'get', '/book-appointment/', None),
+            ('api:doctors', api, 'get', '/api/accounts/doctors/', None),
+            ('api:patients', api, 'get', '/api/accounts/patients/', None),
+            ('api:dashboard', api, 'get', '/api/accounts/dashboard/', None),
+            ('api:specializations', api, 'get', '/api/accounts/specializations/?q=car', None),
+            ('api:appointments', api, 'get', '/api/appointments/', None),
+            ('api:appointment-detail', api, 'get', f'/api/appointments/{appointment.pk}/', None),
+            ('api:slots', api, 'get', f'/api/appointments/slots/?doctor={doctor.pk}&start={start.isoformat()}&end={(start + timedelta(days=6)).isoformat()}', None),
+            ('api:invoices', api, 'get', '/api/billing/', None),
+            ('api:revenue', api, 'get', '/api/billing/revenue/', None),
+            ('api:prescriptions', api, 'get', '/api/prescriptions/', None),
+        ]
+        if booking:
+            scenarios += [
+                ('portal:book-appointment-submit', portal['patient'], 'post', '/book-appointment/', booking),
+                ('api:appointment-create', api, 'post', '/api/appointments/', {**booking, 'patient': patient.pk}),
+            ]
+        return scenarios
+
+    def request(self, client, method, path, data):
+        # Writes are rolled back so every iteration sees the same data.
+        try:
+            with transaction.atomic():
+                if method == 'get':
+                    response = client.get(path)
+                elif path.startswith('/api/'):
+                    response = client.post(path, data, content_type='application/json')
+                else:
+                    response = client.post(path, data)
+                raise Rollback(response)
+        except Rollback as rollback:
+            response = rollback.args[0]
+        if response.status_code >= 400:
+            raise CommandError(f'{method.upper()} {path} returned {response.status_code}.')
+        return response
+
+    def measure(self, client, method, path, data, iterations, warmup):
+        for _ in range(warmup):
+            self.request(client, method, path, data)
+
+        latencies = []
+        queries = 0
+        for _ in range(max(1, iterations)):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                self.request(client, method, path, data)
+                latencies.append((time.perf_counter() - started) * 1000)
+            # SAVEPOINT/ROLLBACK from the wrapper are not the view's queries.
+            queries = max(queries, sum(1 for query in captured.captured_queries if 'SAVEPOINT' not in query['sql']))
+
+        # Memory is traced in a separate pass; tracemalloc slows execution.
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            self.request(client, method, path, data)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'queries': queries,
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<42} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+            f"p99 {result['p99_ms']:>8.2f}ms  {result['queries']:>3} queries  {result['peak_kib']:>9.1f} KiB"
+        )
+
+    def compare(self, results, baseline, threshold):
+        regressions = []
+        for name, result in results.items():
+            expected = baseline.get(name)
+            if expected is None:
+                continue
+            if result['queries'] > expected['queries']:
+                regressions.append(f"{name}: {result['queries']} queries (baseline {expected['queries']})")
+            limit = expected['p95_ms'] * (1 + threshold)
+            if result['p95_ms'] > max(limit, expected['p95_ms'] + LATENCY_FLOOR_MS):
+                regressions.append(f"{name}: p95 {result['p95_ms']}ms (baseline {expected['p95_ms']}ms)")
+            if result['peak_kib'] > expected['peak_kib'] * (1 + threshold):
+                regressions.append(f"{name}: peak {result['peak_kib']} KiB (baseline {expected['peak_kib']} KiB)")
+        if regressions:
+            raise CommandError('Performance regressions:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
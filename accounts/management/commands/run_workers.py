@@ -0,0 +1,37 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from accounts.jobs import work, worker_name
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue until stopped (SIGTERM/SIGINT finish the current job first).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help='Worker threads in this process.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty.')
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stop.set())
+
+        threads = [
+            threading.Thread(
+                target=work,
+                args=(worker_name(index), stop, options['poll_interval'], options['burst']),
+                name=f'hms-worker-{index}',
+            )
+            for index in range(max(1, options['concurrency']))
+        ]
+        self.stdout.write(f'Starting {len(threads)} worker thread(s).')
+        for thread in threads:
+            thread.start()
+        # Joined with a timeout so the main thread keeps handling signals.
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+        self.stdout.write('Workers stopped.')
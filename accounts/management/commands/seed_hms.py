@@ -0,0 +1,195 @@
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.bulk import bulk_saved
+from accounts.models import Doctor, Patient, Specialization, User
+from appointments.models import Appointment
+from appointments.slots import DEFAULT_WORKING_HOURS
+from billing.models import Invoice
+from prescriptions.models import Prescription
+
+SEED_DOMAIN = 'seed.hms.test'
+SEED_PASSWORD = 'seed-password'
+BATCH_SIZE = 2000
+
+SPECIALIZATIONS = (
+    'Cardiology', 'Dermatology', 'Endocrinology', 'Gastroenterology', 'General Medicine', 'Neurology',
+    'Obstetrics and Gynecology', 'Oncology', 'Ophthalmology', 'Orthopedics', 'Pediatrics', 'Psychiatry',
+)
+FIRST_NAMES = (
+    'Aarav', 'Aditi', 'Ananya', 'Arjun', 'Diya', 'Ishaan', 'Kabir', 'Meera', 'Neha', 'Priya',
+    'Rahul', 'Riya', 'Rohan', 'Saanvi', 'Sahil', 'Sara', 'Tanvi', 'Vikram', 'Vivaan', 'Zoya',
+)
+LAST_NAMES = (
+    'Bose', 'Chopra', 'Das', 'Gupta', 'Iyer', 'Joshi', 'Kapoor', 'Khan', 'Mehta', 'Nair',
+    'Patel', 'Rana', 'Reddy', 'Shah', 'Sharma', 'Singh', 'Verma',
+)
+REASONS = ('Follow-up visit', 'Fever and cough', 'Routine check-up', 'Back pain', 'Skin rash', 'Headache', '')
+DIAGNOSES = ('Viral fever', 'Hypertension', 'Migraine', 'Allergic dermatitis', 'Lower back strain', 'Type 2 diabetes')
+MEDICINES = ('Paracetamol 500mg', 'Amlodipine 5mg', 'Cetirizine 10mg', 'Ibuprofen 400mg', 'Metformin 500mg')
+
+
+class Command(BaseCommand):
+    help = f'Generate synthetic doctors, patients, appointments, invoices and prescriptions (users @{SEED_DOMAIN}).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--doctors', type=int, default=50)
+        parser.add_argument('--patients', type=int, default=2000)
+        parser.add_argument('--days', type=int, default=60, help='Days of history before today.')
+        parser.add_argument('--future-days', type=int, default=14)
+        parser.add_argument('--appointments-per-day', type=int, default=200)
+        parser.add_argument('--invoice-ratio', type=float, default=0.8, help='Share of completed appointments invoiced.')
+        parser.add_argument('--paid-ratio', type=float, default=0.7, help='Share of invoices already paid.')
+        parser.add_argument('--prescription-ratio', type=float, default=0.6, help='Share of completed appointments with a prescription.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed produces the same data.')
+        parser.add_argument(
+            '--anchor-date',
+            type=date.fromisoformat,
+            help='Day treated as "today" (YYYY-MM-DD); pin it to reproduce a data set exactly.',
+        )
+        parser.add_argument('--clear', action='store_true', help=f'Delete previously seeded @{SEED_DOMAIN} users first.')
+
+    def handle(self, *args, **options):
+        seeded = User.objects.filter(email__endswith=f'@{SEED_DOMAIN}')
+        if options['clear']:
+            deleted, _ = seeded.delete()
+            self.stdout.write(f'Deleted {deleted} previously seeded rows.')
+        elif seeded.exists():
+            raise CommandError('Seed data already exists; rerun with --clear to replace it.')
+
+        rng = random.Random(options['seed'])
+        self.today = options['anchor_date'] or timezone.localdate()
+        # One hash shared by every seeded account keeps seeding fast.
+        password = make_password(SEED_PASSWORD)
+
+        with transaction.atomic():
+            User.objects.create_user(
+                username=f'admin@{SEED_DOMAIN}',
+                email=f'admin@{SEED_DOMAIN}',
+                password=SEED_PASSWORD,
+                role='ADMIN',
+                is_staff=True,
+            )
+            doctors = self.create_doctors(rng, options['doctors'], password)
+            patients = self.create_patients(rng, options['patients'], password)
+            appointments = self.create_appointments(rng, doctors, patients, options)
+            invoices, prescriptions = self.create_billing(rng, appointments, options)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(doctors)} doctors, {len(patients)} patients, {len(appointments)} appointments, '
+            f'{invoices} invoices and {prescriptions} prescriptions. Log in as admin@{SEED_DOMAIN} / {SEED_PASSWORD}.'
+        ))
+
+    def create_users(self, rng, role, count, password):
+        users = []
+        for index in range(count):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            email = f'{role.lower()}{index}@{SEED_DOMAIN}'
+            users.append(User(
+                username=email,
+                email=email,
+                first_name=first_name,
+                last_name=last_name,
+                role=role,
+                password=password,
+            ))
+        return User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+
+    def create_doctors(self, rng, count, password):
+        specialties = [Specialization.for_name(name) for name in SPECIALIZATIONS]
+        doctors = []
+        for index, user in enumerate(self.create_users(rng, 'DOCTOR', count, password)):
+            specialty = rng.choice(specialties)
+            doctors.append(Doctor(
+                user=user,
+                specialization=specialty.name,
+                specialty=specialty,
+                license_number=f'SEED-{index:06d}',
+            ))
+        Doctor.objects.bulk_create(doctors, batch_size=BATCH_SIZE)
+        bulk_saved.send(sender=Doctor, instances=doctors, previous=[None] * len(doctors))
+        return doctors
+
+    def create_patients(self, rng, count, password):
+        patients = []
+        for user in self.create_users(rng, 'PATIENT', count, password):
+            age = rng.randint(1, 90)
+            patients.append(Patient(
+                user=user,
+                age=age,
+                dob=self.today - timedelta(days=age * 365 + rng.randint(0, 364)),
+                gender=rng.choice(('Male', 'Female')),
+                contact_number=f'9{rng.randint(100000000, 999999999)}',
+            ))
+        Patient.objects.bulk_create(patients, batch_size=BATCH_SIZE)
+        bulk_saved.send(sender=Patient, instances=patients, previous=[None] * len(patients))
+        return patients
+
+    def create_appointments(self, rng, doctors, patients, options):
+        if not doctors or not patients:
+            return []
+        appointments = []
+        for offset in range(-options['days'], options['future_days'] + 1):
+            day = self.today + timedelta(days=offset)
+            slots = [
+                (doctor, (datetime.combine(day, start) + timedelta(minutes=minute)).time())
+                for doctor in doctors
+                for start, end, length in DEFAULT_WORKING_HOURS.get(day.weekday(), [])
+                for minute in range(0, (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute), length)
+            ]
+            for doctor, at in rng.sample(slots, min(options['appointments_per_day'], len(slots))):
+                if offset < 0:
+                    status = 'CANCELLED' if rng.random() < 0.1 else 'COMPLETED'
+                else:
+                    status = 'CANCELLED' if rng.random() < 0.05 else 'SCHEDULED'
+                appointments.append(Appointment(
+                    doctor=doctor,
+                    patient=rng.choice(patients),
+                    date=day,
+                    time=at,
+                    reason=rng.choice(REASONS),
+                    status=status,
+                ))
+        Appointment.objects.bulk_create(appointments, batch_size=BATCH_SIZE)
+        bulk_saved.send(sender=Appointment, instances=appointments, previous=[None] * len(appointments))
+        return appointments
+
+    def create_billing(self, rng, appointments, options):
+        invoices = []
+        prescriptions = []
+        for appointment in appointments:
+            if appointment.status != 'COMPLETED':
+                continue
+            if rng.random() < options['invoice_ratio']:
+                invoices.append(Invoice(
+                    appointment=appointment,
+                    amount=Decimal(rng.randrange(300, 3000, 50)),
+                    paid=rng.random() < options['paid_ratio'],
+                ))
+            if rng.random() < options['prescription_ratio']:
+                prescriptions.append(Prescription(
+                    appointment=appointment,
+                    diagnosis=rng.choice(DIAGNOSES),
+                    medicines=', '.join(rng.sample(MEDICINES, rng.randint(1, 3))),
+                    notes='Review after one week.',
+                ))
+        Invoice.objects.bulk_create(invoices, batch_size=BATCH_SIZE)
+        # issued_at is stamped on insert; backdate it to the visit so the
+        # revenue series has history, and pay within two weeks of it.
+        now = timezone.now()
+        for invoice in invoices:
+            visit = timezone.make_aware(datetime.combine(invoice.appointment.date, invoice.appointment.time))
+            invoice.issued_at = min(visit + timedelta(hours=1), now)
+            if invoice.paid:
+                invoice.paid_at = min(invoice.issued_at + timedelta(days=rng.randint(0, 14)), now)
+        Invoice.objects.bulk_update(invoices, ['issued_at', 'paid_at'], batch_size=BATCH_SIZE)
+        bulk_saved.send(sender=Invoice, instances=invoices, previous=[None] * len(invoices))
+        Prescription.objects.bulk_create(prescriptions, batch_size=BATCH_SIZE)
+        bulk_saved.send(sender=Prescription, instances=prescriptions, previous=[None] * len(prescriptions))
+        return len(invoices), len(prescriptions)
@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+UNRESOLVED_VIEW = 'unresolved'
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, label, value):
+        counts, total, observations = self.series.get(label, ([0] * len(self.buckets), 0, 0))
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+        self.series[label] = (counts, total + value, observations + 1)
+
+    def render(self, label_name):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        for label, (counts, total, observations) in sorted(self.series.items()):
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="+Inf"}} {observations}')
+            lines.append(f'{self.name}_sum{{{label_name}="{label}"}} {total}')
+            lines.append(f'{self.name}_count{{{label_name}="{label}"}} {observations}')
+        return lines
+
+
+class Registry:
+    # Aggregated per worker process, so each scrape reflects the worker that
+    # served it; sum() across instances in Prometheus for the whole picture.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.histograms = [
+            Histogram('hms_request_duration_seconds', 'Wall time spent handling the request.', DURATION_BUCKETS),
+            Histogram('hms_request_db_seconds', 'Time spent in database queries.', DURATION_BUCKETS),
+            Histogram('hms_request_queries', 'Database queries per request.', QUERY_BUCKETS),
+            Histogram(
+                'hms_request_duplicate_queries',
+                'Queries per request repeating an earlier SQL statement (N+1 signal).',
+                QUERY_BUCKETS,
+            ),
+            Histogram('hms_response_size_bytes', 'Response body size.', SIZE_BUCKETS),
+        ]
+        self.responses = Counter()
+        self.cache_lookups = Counter()
+
+    def record(self, view, status, values, cache_hits, cache_misses):
+        with self.lock:
+            self.responses[(view, f'{status // 100}xx')] += 1
+            self.cache_lookups[(view, 'hit')] += cache_hits
+            self.cache_lookups[(view, 'miss')] += cache_misses
+            for histogram, value in zip(self.histograms, values):
+                if value is not None:
+                    histogram.observe(view, value)
+
+    def render(self):
+        with self.lock:
+            lines = []
+            for histogram in self.histograms:
+                lines.extend(histogram.render('view'))
+            lines.extend(['# HELP hms_responses_total Responses by view and status class.', '# TYPE hms_responses_total counter'])
+            for (view, status), count in sorted(self.responses.items()):
+                lines.append(f'hms_responses_total{{view="{view}",status="{status}"}} {count}')
+            lines.extend(['# HELP hms_cache_lookups_total Cache reads by view and result.', '# TYPE hms_cache_lookups_total counter'])
+            for (view, result), count in sorted(self.cache_lookups.items()):
+                lines.append(f'hms_cache_lookups_total{{view="{view}",result="{result}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class RequestMetrics:
+    def __init__(self):
+        # Queries of one request may run on several threads (see
+        # accounts.concurrency).
+        self.lock = threading.Lock()
+        self.db_time = 0.0
+        self.queries = 0
+        self.statements = defaultdict(int)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.db_time += elapsed
+                self.queries += 1
+                self.statements[sql] += 1
+
+    @property
+    def duplicate_queries(self):
+        return self.queries - len(self.statements)
+
+
+def record_query(execute, sql, params, many, context):
+    # Installed on every connection when it opens; a no-op outside requests.
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def instrument_connection(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def record_cache_lookups(hits, misses):
+    metrics = _current.get()
+    if metrics is not None:
+        with metrics.lock:
+            metrics.cache_hits += hits
+            metrics.cache_misses += misses
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match and match.view_name else UNRESOLVED_VIEW
+
+
+def _response_size(response):
+    if response.streaming:
+        return None
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    # Install first in MIDDLEWARE so the timings cover the whole stack.
+    # Queries run while a streaming response is iterated happen after this
+    # returns and are not counted.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.record(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.record(request, response, metrics, time.perf_counter() - start)
+
+    def record(self, request, response, metrics, duration):
+        REGISTRY.record(
+            _view_name(request),
+            response.status_code,
+            (duration, metrics.db_time, metrics.queries, metrics.duplicate_queries, _response_size(response)),
+            metrics.cache_hits,
+            metrics.cache_misses,
+        )
+        return response
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_specializations(apps, schema_editor):
+    Doctor = apps.get_model('accounts', 'Doctor')
+    Specialization = apps.get_model('accounts', 'Specialization')
+    for doctor in Doctor.objects.all().iterator():
+        name = ' '.join(doctor.specialization.split())
+        if not name:
+            continue
+        specialization, _ = Specialization.objects.get_or_create(normalized_name=name.lower(), defaults={'name': name})
+        Doctor.objects.filter(pk=doctor.pk).update(specialization=name, specialty=specialization)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_and_contactquery_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Specialization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120)),
+                ('normalized_name', models.CharField(max_length=120, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='doctor',
+            name='specialty',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='doctors', to='accounts.specialization'),
+        ),
+        migrations.RunPython(link_specializations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-18 05:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_specialization_catalogue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from accounts.search import install_search_indexes
+
+    install_search_indexes(schema_editor)
+
+
+def drop(apps, schema_editor):
+    from accounts.search import drop_search_indexes
+
+    drop_search_indexes(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_job'),
+        ('prescriptions', '0003_prescription_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, drop),
+    ]
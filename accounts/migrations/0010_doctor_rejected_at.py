@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_full_text_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='rejected_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
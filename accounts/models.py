@@ -1,5 +1,22 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+
+class TrackedModel(models.Model):
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # auto_now is only written when the column is among update_fields.
+        update_fields = kwargs.get('update_fields')
+        if update_fields:
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
+        super().save(*args, **kwargs)
 
 
 class User(AbstractUser):
@@ -10,20 +27,61 @@ class User(AbstractUser):
     )
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='PATIENT')
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            models.Index(fields=['id'], condition=models.Q(role='DOCTOR', is_active=False), name='user_pending_doctor_idx'),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.role})"
 
 
-class Doctor(models.Model):
+def normalize_specialization(name):
+    return ' '.join(name.split())
+
+
+class Specialization(models.Model):
+    name = models.CharField(max_length=120)
+    normalized_name = models.CharField(max_length=120, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def for_name(cls, name):
+        name = normalize_specialization(name)
+        specialization, _ = cls.objects.get_or_create(normalized_name=name.lower(), defaults={'name': name})
+        return specialization
+
+
+class Doctor(TrackedModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='doctor_profile')
     specialization = models.CharField(max_length=120)
+    specialty = models.ForeignKey(Specialization, null=True, blank=True, on_delete=models.SET_NULL, related_name='doctors')
     license_number = models.CharField(max_length=80, unique=True)
+    # Set when an admin rejects the sign-up; the account is deleted by a job.
+    rejected_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return self.user.get_full_name() or self.user.username
 
+    def save(self, *args, **kwargs):
+        # Keep the catalogue link in step with the free-text specialization.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'specialization' in update_fields:
+            self.specialization = normalize_specialization(self.specialization)
+            self.specialty = Specialization.for_name(self.specialization) if self.specialization else None
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'specialty'}
+        super().save(*args, **kwargs)
 
-class Patient(models.Model):
+
+class Patient(TrackedModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='patient_profile')
     dob = models.DateField(null=True, blank=True)
     age = models.PositiveIntegerField(null=True, blank=True)
@@ -46,8 +104,46 @@ class ContactQuery(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='contactquery_created_idx'),
+        ]
         verbose_name = 'Contact Query'
         verbose_name_plural = 'Contact Queries'
 
     def __str__(self):
         return f"{self.name} - Query #{self.id}"
+
+
+class Job(models.Model):
+    # A unit of background work, run by `manage.py run_workers` (see accounts.jobs).
+    STATUS_CHOICES = (
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('SUCCEEDED', 'Succeeded'),
+        ('FAILED', 'Failed'),
+    )
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=120, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    progress_message = models.CharField(max_length=200, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['run_after', 'id'], condition=models.Q(status='QUEUED'), name='job_queued_idx'),
+            models.Index(fields=['heartbeat_at'], condition=models.Q(status='RUNNING'), name='job_running_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
@@ -0,0 +1,132 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def keyset_page(queryset, key, after=None, limit=DEFAULT_PAGE_SIZE):
+    # Seek past the last seen key instead of using OFFSET, so every page
+    # costs one index range scan no matter how deep the client has scrolled.
+    field = key.lstrip('-')
+    descending = key.startswith('-')
+    if after is not None:
+        lookup = f'{field}__lt' if descending else f'{field}__gt'
+        queryset = queryset.filter(**{lookup: after})
+
+    rows = list(queryset.order_by(key)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = getattr(rows[-1], field) if has_more else None
+    return rows, next_cursor
+
+
+class KeysetCursorPagination(BasePagination):
+    # DRF's CursorPagination positions on the first ordering field only and
+    # falls back to offsets for ties. This paginator encodes every ordering
+    # field in the cursor and seeks with a lexicographic comparison, so pages
+    # stay stable and index-backed for keys like (date, time, id).
+    ordering = ('-id',)
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.model = queryset.model
+        page_size = parse_page_size(request.query_params.get(self.page_size_query_param), self.page_size)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+
+        rows = list(queryset[:page_size + 1])
+        self.next_position = self.position_of(rows[page_size - 1]) if len(rows) > page_size else None
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def keys(self):
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def position_of(self, instance):
+        return [self.model._meta.get_field(name).value_to_string(instance) for name, _ in self.keys()]
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            keys = self.keys()
+            if not isinstance(raw, list) or len(raw) != len(keys):
+                raise ValueError
+            return [self.model._meta.get_field(name).to_python(value) for (name, _), value in zip(keys, raw)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def seek_filter(self, position):
+        # (a, b, c) > (x, y, z)  ==  a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z),
+        # plus a redundant a >= x so the planner can range-scan the leading column.
+        keys = self.keys()
+        clauses = []
+        for index, (name, descending) in enumerate(keys):
+            equal = {key: value for (key, _), value in zip(keys[:index], position[:index])}
+            clauses.append(Q(**equal, **{f"{name}__{'lt' if descending else 'gt'}": position[index]}))
+        lead, lead_descending = keys[0]
+        return Q(**{f"{lead}__{'lte' if lead_descending else 'gte'}": position[0]}) & reduce(or_, clauses)
+
+
+class AppointmentCursorPagination(KeysetCursorPagination):
+    ordering = ('-date', '-time', '-id')
+
+
+class InvoiceCursorPagination(KeysetCursorPagination):
+    ordering = ('-issued_at', '-id')
+
+
+class PrescriptionCursorPagination(KeysetCursorPagination):
+    ordering = ('-created_at', '-id')
+
+
+class ProfileCursorPagination(KeysetCursorPagination):
+    ordering = ('id',)
@@ -0,0 +1,124 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from appointments.counters import doctor_counter, patient_counter
+from appointments.models import Appointment
+from billing.models import Invoice
+from prescriptions.models import Prescription
+
+from .routers import primary_reads
+
+
+def _set_status(status, verb, refuse_if=None):
+    def handle(appointment, data):
+        if appointment.status == refuse_if:
+            return 'error', f'Appointment is already {refuse_if.lower()}.'
+        appointment.status = status
+        appointment.save(update_fields=['status'])
+        return 'success', f'Appointment #{appointment.id} {verb} successfully.'
+    return handle
+
+
+def _save_prescription(appointment, data):
+    diagnosis = data.get('diagnosis', '').strip()
+    medicines = data.get('medicines', '').strip()
+    if not (diagnosis and medicines):
+        return 'error', 'Diagnosis and medicines are required.'
+    # Assigned back so the reverse relation the card renders is current.
+    appointment.prescription, _ = Prescription.objects.update_or_create(
+        appointment=appointment,
+        defaults={'diagnosis': diagnosis, 'medicines': medicines, 'notes': data.get('notes', '').strip()},
+    )
+    return 'success', f'Prescription saved for Appointment #{appointment.id}.'
+
+
+def _save_bill(appointment, data):
+    try:
+        amount = Decimal(data.get('amount', '').strip()).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return 'error', 'Invalid amount entered.'
+    if not amount.is_finite():
+        return 'error', 'Invalid amount entered.'
+    appointment.invoice, _ = Invoice.objects.update_or_create(appointment=appointment, defaults={'amount': amount, 'paid': False})
+    return 'success', f'Bill created for Appointment #{appointment.id}.'
+
+
+def _pay_bill(appointment, data):
+    invoice = getattr(appointment, 'invoice', None)
+    if invoice is None:
+        return 'error', 'Bill not yet created by doctor.'
+    if invoice.paid:
+        return 'error', 'This appointment has already been paid.'
+    invoice.paid = True
+    invoice.save(update_fields=['paid'])
+    return 'success', f'Payment of ${invoice.amount} received successfully for Appointment #{appointment.id}.'
+
+
+# Per portal: the profile owning the appointments, the actions it may take
+# on one (the POST `action` names of its page), the template of a single
+# appointment card and its appointment counter.
+PORTALS = {
+    'doctor': {
+        'owner': 'doctor',
+        'related': ('patient__user',),
+        'actions': {
+            'confirm_appointment': _set_status('COMPLETED', 'confirmed'),
+            'reject_appointment': _set_status('CANCELLED', 'rejected'),
+            'create_prescription': _save_prescription,
+            'create_bill': _save_bill,
+        },
+        'card': 'partials/doctor_appointment_card.html',
+        'counter': doctor_counter,
+    },
+    'patient': {
+        'owner': 'patient',
+        'related': ('doctor__user',),
+        'actions': {
+            'cancel_appointment': _set_status('CANCELLED', 'cancelled', refuse_if='CANCELLED'),
+            'pay_bill': _pay_bill,
+        },
+        'card': 'partials/patient_appointment_card.html',
+        'counter': patient_counter,
+    },
+}
+
+
+def portal_appointment(portal, owner, appointment_id, lock=False):
+    # The owner's appointment with everything its card shows. With `lock`
+    # (inside a transaction) the row is locked first on its own: the
+    # invoice and prescription outer joins cannot be locked, and reading
+    # them after the lock is held sees whatever write it waited on.
+    config = PORTALS[portal]
+    try:
+        appointment_id = int(appointment_id)
+    except (TypeError, ValueError):
+        return None
+    appointments = Appointment.objects.filter(id=appointment_id, **{config['owner']: owner})
+    if lock and not list(appointments.select_for_update().values_list('pk', flat=True)):
+        return None
+    return appointments.select_related(*config['related'], 'prescription', 'invoice').first()
+
+
+def run_portal_action(portal, owner, action, appointment_id, data):
+    # Returns (appointment, level, message); appointment is None when it is
+    # not one of the owner's. The checks and the write run under the row
+    # lock, so two concurrent cancels or payments cannot both pass.
+    with transaction.atomic():
+        appointment = portal_appointment(portal, owner, appointment_id, lock=True)
+        if appointment is None:
+            return None, 'error', 'Appointment not found.'
+        level, message = PORTALS[portal]['actions'][action](appointment, data)
+    return appointment, level, message
+
+
+def portal_counts(portal, owner):
+    # Read from the primary: the counter row was just updated by the action.
+    with primary_reads():
+        counter = PORTALS[portal]['counter'](owner)
+    return {
+        'total': counter.total,
+        'scheduled': counter.scheduled,
+        'completed': counter.completed,
+        'cancelled': counter.cancelled,
+    }
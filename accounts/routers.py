@@ -0,0 +1,111 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_COOKIE = 'hms_primary'
+# Sessions are read right after login/logout writes them; never lag them.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+_routing = ContextVar('db_routing', default=None)
+_primary_only = ContextVar('db_primary_only', default=False)
+
+
+class RoutingState:
+    def __init__(self, replica):
+        self.replica = replica
+        self.wrote = False
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+@contextmanager
+def primary_reads():
+    # For reads whose result is written back (counters) or shared through the
+    # cache under a freshly bumped version: a lagging replica must not feed them.
+    token = _primary_only.set(True)
+    try:
+        yield
+    finally:
+        _primary_only.reset(token)
+
+
+class ReplicaRouter:
+    # Reads outside a request (management commands, shell) stay on the primary.
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or state.replica is None or state.wrote or _primary_only.get():
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in PRIMARY_ONLY_APPS or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        # Once a request writes, its later reads must see that write.
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    # Safe-method requests read from one replica, picked per request. A
+    # request that writes sets a short-lived cookie so the same browser's
+    # next requests read from the primary until the replicas catch up.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self.routing_state(request)
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        return self.stick(response, state)
+
+    async def __acall__(self, request):
+        state = self.routing_state(request)
+        token = _routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        return self.stick(response, state)
+
+    def routing_state(self, request):
+        replicas = replica_aliases()
+        if replicas and request.method in SAFE_METHODS and STICKY_COOKIE not in request.COOKIES:
+            return RoutingState(random.choice(replicas))
+        return RoutingState(None)
+
+    def stick(self, response, state):
+        if state.wrote and replica_aliases():
+            response.set_cookie(
+                STICKY_COOKIE,
+                '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
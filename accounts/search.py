@@ -0,0 +1,181 @@
+import re
+
+from django.apps import apps
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Full-text indexes kept by the database itself, so every write path (save,
+# bulk_create, queryset.update, raw SQL) stays in sync:
+#   SQLite: an external-content FTS5 table per model, maintained by triggers;
+#   PostgreSQL: a generated, weighted tsvector column with a GIN index.
+# Columns are listed with their weight; A ranks highest.
+SEARCH_SOURCES = {
+    'queries': {
+        'model': 'accounts.ContactQuery',
+        'columns': (('name', 'A'), ('problem', 'B'), ('address', 'C'), ('admin_reply', 'C')),
+        'fields': ('id', 'name', 'problem', 'admin_reply', 'created_at', 'replied_at'),
+    },
+    'prescriptions': {
+        'model': 'prescriptions.Prescription',
+        'columns': (('diagnosis', 'A'), ('medicines', 'B'), ('notes', 'C')),
+        'fields': ('id', 'appointment_id', 'diagnosis', 'medicines', 'notes', 'created_at'),
+    },
+}
+SEARCH_CONFIG = 'english'
+SEARCH_COLUMN = 'search_document'
+MAX_SEARCH_TERMS = 8
+BM25_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 1.0}
+
+
+def _model(kind):
+    return apps.get_model(SEARCH_SOURCES[kind]['model'])
+
+
+def _table(kind):
+    return _model(kind)._meta.db_table
+
+
+def _read_connection(kind):
+    return connections[router.db_for_read(_model(kind))]
+
+
+def _sqlite_statements(kind):
+    table = _table(kind)
+    fts = f'{table}_fts'
+    columns = [name for name, _ in SEARCH_SOURCES[kind]['columns']]
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{name}' for name in columns)
+    old = ', '.join(f'old.{name}' for name in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', content_rowid='id', tokenize='porter unicode61')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN '
+        f'INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); END",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {names} ON {table} BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+        f'INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _postgresql_statements(kind):
+    table = _table(kind)
+    document = ' || '.join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({name}, '')), '{weight}')"
+        for name, weight in SEARCH_SOURCES[kind]['columns']
+    )
+    return [
+        f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {SEARCH_COLUMN} tsvector GENERATED ALWAYS AS ({document}) STORED',
+        f'CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} USING GIN ({SEARCH_COLUMN})',
+    ]
+
+
+def _sqlite_drop_statements(kind):
+    fts = f'{_table(kind)}_fts'
+    return [f'DROP TABLE IF EXISTS {fts}'] + [f'DROP TRIGGER IF EXISTS {fts}_{event}' for event in ('insert', 'delete', 'update')]
+
+
+def _postgresql_drop_statements(kind):
+    table = _table(kind)
+    return [f'DROP INDEX IF EXISTS {table}_search_idx', f'ALTER TABLE {table} DROP COLUMN IF EXISTS {SEARCH_COLUMN}']
+
+
+INSTALL_STATEMENTS = {'sqlite': _sqlite_statements, 'postgresql': _postgresql_statements}
+DROP_STATEMENTS = {'sqlite': _sqlite_drop_statements, 'postgresql': _postgresql_drop_statements}
+
+
+def install_search_indexes(schema_editor):
+    # Idempotent: on SQLite it also re-creates triggers lost when a later
+    # migration rebuilds one of the tables, and re-indexes every row.
+    statements = INSTALL_STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    for kind in SEARCH_SOURCES:
+        for sql in statements(kind):
+            schema_editor.execute(sql)
+
+
+def drop_search_indexes(schema_editor):
+    statements = DROP_STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    for kind in SEARCH_SOURCES:
+        for sql in statements(kind):
+            schema_editor.execute(sql)
+
+
+def search_terms(text):
+    # Only word characters reach the query language, so user input can never
+    # form operators; every term must match, as a prefix.
+    return re.findall(r'\w+', (text or '').lower())[:MAX_SEARCH_TERMS]
+
+
+def _sqlite_match(kind, terms):
+    fts = f'{_table(kind)}_fts'
+    weights = ', '.join(str(BM25_WEIGHTS[weight]) for _, weight in SEARCH_SOURCES[kind]['columns'])
+    # bm25() is lower-is-better; negated so both backends rank descending.
+    return fts, f'-bm25({fts}, {weights})', f'{fts} MATCH %s', ' '.join(f'"{term}"*' for term in terms)
+
+
+def search(kind, text, limit, offset=0):
+    # Returns [(pk, rank)] best first, or None when the text has no terms.
+    terms = search_terms(text)
+    if not terms:
+        return None
+    connection = _read_connection(kind)
+    if connection.vendor == 'postgresql':
+        table = _table(kind)
+        sql = (
+            f"SELECT id, ts_rank_cd({SEARCH_COLUMN}, query) AS rank FROM {table}, to_tsquery('{SEARCH_CONFIG}', %s) query "
+            f'WHERE {SEARCH_COLUMN} @@ query ORDER BY rank DESC, id DESC LIMIT %s OFFSET %s'
+        )
+        params = [' & '.join(f'{term}:*' for term in terms), limit, offset]
+    else:
+        fts, rank, condition, match = _sqlite_match(kind, terms)
+        sql = f'SELECT rowid, {rank} AS rank FROM {fts} WHERE {condition} ORDER BY rank DESC, rowid DESC LIMIT %s OFFSET %s'
+        params = [match, limit, offset]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def matching_ids(kind, text):
+    # A subquery of matching primary keys for `pk__in=`, or None.
+    terms = search_terms(text)
+    if not terms:
+        return None
+    if _read_connection(kind).vendor == 'postgresql':
+        return RawSQL(
+            f"SELECT id FROM {_table(kind)} WHERE {SEARCH_COLUMN} @@ to_tsquery('{SEARCH_CONFIG}', %s)",
+            [' & '.join(f'{term}:*' for term in terms)],
+        )
+    fts, _, condition, match = _sqlite_match(kind, terms)
+    return RawSQL(f'SELECT rowid FROM {fts} WHERE {condition}', [match])
+
+
+def search_rows(kind, text, limit, offset=0):
+    # One page of ranked hits with their display fields; None without terms.
+    hits = search(kind, text, limit, offset)
+    if hits is None:
+        return None
+    rows = {row['id']: row for row in _model(kind).objects.filter(pk__in=[pk for pk, _ in hits]).values(*SEARCH_SOURCES[kind]['fields'])}
+    return [{**rows[pk], 'rank': rank} for pk, rank in hits if pk in rows]
+
+
+class FullTextSearchAdminMixin:
+    # Admin search through the full-text index; search_fields outside the
+    # indexed columns (e.g. usernames) are still matched with icontains.
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        matches = matching_ids(self.search_kind, search_term)
+        if matches is None:
+            return super().get_search_results(request, queryset, search_term)
+        indexed = {name for name, _ in SEARCH_SOURCES[self.search_kind]['columns']}
+        condition = Q(pk__in=matches)
+        for field in self.get_search_fields(request):
+            if field not in indexed:
+                condition |= Q(**{f'{field}__icontains': search_term})
+        return queryset.filter(condition), False
@@ -1,7 +1,12 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from .fieldsets import SparseFieldsetSerializerMixin
 from .models import Doctor, Patient
+from .search import SEARCH_SOURCES
+
+# Deep pages of a ranked search are rarely wanted and cost an OFFSET scan.
+MAX_SEARCH_PAGE = 50
 
 User = get_user_model()
 
@@ -28,7 +33,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 
-class DoctorSerializer(serializers.ModelSerializer):
+class DoctorSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.filter(role='DOCTOR'),
@@ -41,7 +46,7 @@ class DoctorSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'user_id', 'specialization', 'license_number']
 
 
-class PatientSerializer(serializers.ModelSerializer):
+class PatientSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.filter(role='PATIENT'),
@@ -52,3 +57,9 @@ class PatientSerializer(serializers.ModelSerializer):
     class Meta:
         model = Patient
         fields = ['id', 'user', 'user_id', 'age', 'gender', 'contact_number']
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    type = serializers.ChoiceField(choices=list(SEARCH_SOURCES), default='queries')
+    page = serializers.IntegerField(min_value=1, max_value=MAX_SEARCH_PAGE, default=1)
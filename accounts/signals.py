@@ -0,0 +1,216 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from appointments.models import Appointment
+from billing.models import Invoice
+from prescriptions.models import Prescription
+
+from .bulk import bulk_saved
+from .dashboard import appointment_deltas, invoice_deltas, reconcile_stats, record_stats_change
+from .fragments import bump_fragment_versions
+from .metrics import instrument_connection
+from .models import ContactQuery, Doctor, Patient, User
+from .specializations import invalidate_specialization_index
+
+
+@receiver(post_save, sender=Doctor)
+def count_doctor_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_stats_change(doctors=1)
+
+
+@receiver(post_delete, sender=Doctor)
+def count_doctor_deleted(sender, instance, **kwargs):
+    record_stats_change(doctors=-1)
+
+
+@receiver(bulk_saved, sender=Doctor)
+def count_doctors_bulk_created(sender, instances, previous, **kwargs):
+    record_stats_change(doctors=sum(1 for state in previous if state is None))
+    invalidate_specialization_index()
+
+
+@receiver(post_save, sender=Patient)
+def count_patient_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_stats_change(patients=1)
+
+
+@receiver(post_delete, sender=Patient)
+def count_patient_deleted(sender, instance, **kwargs):
+    record_stats_change(patients=-1)
+
+
+@receiver(bulk_saved, sender=Patient)
+def count_patients_bulk_created(sender, instances, previous, **kwargs):
+    record_stats_change(patients=sum(1 for state in previous if state is None))
+
+
+@receiver(post_save, sender=Appointment)
+def count_appointment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        record_stats_change(**appointment_deltas(None, instance.status))
+    elif hasattr(instance, '_loaded_state'):
+        record_stats_change(**appointment_deltas(instance._loaded_state[2], instance.status))
+    else:
+        transaction.on_commit(reconcile_stats)
+
+
+@receiver(post_delete, sender=Appointment)
+def count_appointment_deleted(sender, instance, **kwargs):
+    previous = getattr(instance, '_loaded_state', None) or instance.counter_state()
+    record_stats_change(**appointment_deltas(previous[2], None))
+
+
+@receiver(post_save, sender=Invoice)
+def count_invoice_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        record_stats_change(**invoice_deltas(None, instance.counter_state()))
+    elif hasattr(instance, '_loaded_state'):
+        record_stats_change(**invoice_deltas(instance._loaded_state, instance.counter_state()))
+    else:
+        transaction.on_commit(reconcile_stats)
+
+
+@receiver(post_delete, sender=Invoice)
+def count_invoice_deleted(sender, instance, **kwargs):
+    previous = getattr(instance, '_loaded_state', None) or instance.counter_state()
+    record_stats_change(**invoice_deltas(previous, None))
+
+
+@receiver(bulk_saved, sender=Appointment)
+def count_appointments_bulk_saved(sender, instances, previous, **kwargs):
+    deltas = Counter()
+    for state, instance in zip(previous, instances):
+        deltas.update(appointment_deltas(state[2] if state else None, instance.status))
+    record_stats_change(**deltas)
+
+
+@receiver(bulk_saved, sender=Invoice)
+def count_invoices_bulk_saved(sender, instances, previous, **kwargs):
+    deltas = Counter()
+    for state, instance in zip(previous, instances):
+        deltas.update(invoice_deltas(state, instance.counter_state()))
+    record_stats_change(**deltas)
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def refresh_specializations_on_doctor_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_specialization_index()
+
+
+@receiver(post_save, sender=User)
+def refresh_specializations_on_approval(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Approving a doctor flips User.is_active; logins only touch last_login.
+    if raw or instance.role != 'DOCTOR':
+        return
+    if update_fields is None or 'is_active' in update_fields:
+        invalidate_specialization_index()
+
+
+def _owner_scopes(owners):
+    scopes = {'appointments'}
+    for doctor_id, patient_id in owners:
+        if doctor_id:
+            scopes.add(f'doctor:{doctor_id}')
+        if patient_id:
+            scopes.add(f'patient:{patient_id}')
+    return scopes
+
+
+def _appointment_owners(sender, instances):
+    # Owners of the appointments an invoice or prescription hangs off; one
+    # query covers whatever is not already cached on the instances.
+    owners = []
+    missing = set()
+    for instance in instances:
+        if sender.appointment.is_cached(instance):
+            owners.append((instance.appointment.doctor_id, instance.appointment.patient_id))
+        else:
+            missing.add(instance.appointment_id)
+    if missing:
+        owners.extend(Appointment.objects.filter(pk__in=missing).values_list('doctor_id', 'patient_id'))
+    return owners
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def refresh_appointment_fragments(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    states = [instance.counter_state(), getattr(instance, '_loaded_state', None) or (None, None, None)]
+    bump_fragment_versions(*_owner_scopes(state[:2] for state in states))
+
+
+@receiver(bulk_saved, sender=Appointment)
+def refresh_appointment_fragments_bulk(sender, instances, previous, **kwargs):
+    states = [instance.counter_state() for instance in instances] + [state for state in previous if state]
+    bump_fragment_versions(*_owner_scopes(state[:2] for state in states))
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Invoice)
+@receiver(post_save, sender=Prescription)
+@receiver(post_delete, sender=Prescription)
+def refresh_appointment_detail_fragments(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_fragment_versions(*_owner_scopes(_appointment_owners(sender, [instance])))
+
+
+@receiver(bulk_saved, sender=Invoice)
+@receiver(bulk_saved, sender=Prescription)
+def refresh_appointment_detail_fragments_bulk(sender, instances, **kwargs):
+    bump_fragment_versions(*_owner_scopes(_appointment_owners(sender, instances)))
+
+
+@receiver(post_save, sender=ContactQuery)
+@receiver(post_delete, sender=ContactQuery)
+def refresh_query_fragments(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_fragment_versions('queries')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Patient)
+def refresh_people_fragments(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no fragment shows.
+    if raw or update_fields == frozenset({'last_login'}):
+        return
+    bump_fragment_versions('people')
+
+
+@receiver(bulk_saved, sender=Doctor)
+@receiver(bulk_saved, sender=Patient)
+def refresh_people_fragments_bulk(sender, **kwargs):
+    bump_fragment_versions('people')
+
+
+@receiver(post_save, sender=User)
+def touch_profile_on_user_change(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Profiles serialize their user, so user edits must move the profile's
+    # updated_at for conditional GETs to see them.
+    if raw or created or update_fields == frozenset({'last_login'}):
+        return
+    profile_model = {'DOCTOR': Doctor, 'PATIENT': Patient}.get(instance.role)
+    if profile_model is not None:
+        profile_model.objects.filter(user=instance).update(updated_at=timezone.now())
+
+
+@receiver(connection_created)
+def instrument_new_connection(sender, connection, **kwargs):
+    instrument_connection(connection)
@@ -0,0 +1,84 @@
+import uuid
+from bisect import bisect_left
+from itertools import chain, islice
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .caching import cache_get
+from .models import Specialization, normalize_specialization
+from .routers import primary_reads
+
+CATALOGUE_VERSION_KEY = 'specializations:version'
+AUTOCOMPLETE_LIMIT = 10
+
+
+class SpecializationIndex:
+    # A sorted list of names for full-name prefix matches, a sorted list of
+    # (word, position) pairs for word-prefix matches, and a substring scan
+    # as the last resort. Built once per catalogue version, per process.
+
+    def __init__(self, entries):
+        self.entries = sorted(entries, key=lambda entry: entry[1].lower())
+        self.names = [name.lower() for _, name in self.entries]
+        self.words = sorted((word, position) for position, name in enumerate(self.names) for word in name.split())
+
+    def search(self, query, limit=AUTOCOMPLETE_LIMIT):
+        query = normalize_specialization(query).lower()
+        if not query:
+            return self.entries[:limit]
+
+        matched = []
+        seen = set()
+        for position in chain(self._name_prefix(query), self._word_prefix(query), self._substring(query)):
+            if position in seen:
+                continue
+            seen.add(position)
+            matched.append(position)
+            if limit is not None and len(matched) >= limit:
+                break
+        return [self.entries[position] for position in matched]
+
+    def _name_prefix(self, query):
+        for position in range(bisect_left(self.names, query), len(self.names)):
+            if not self.names[position].startswith(query):
+                return
+            yield position
+
+    def _word_prefix(self, query):
+        for word, position in islice(self.words, bisect_left(self.words, (query,)), None):
+            if not word.startswith(query):
+                return
+            yield position
+
+    def _substring(self, query):
+        for position, name in enumerate(self.names):
+            if query in name:
+                yield position
+
+
+_index = None
+_index_version = None
+
+
+def specialization_index():
+    global _index, _index_version
+    version = cache_get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOGUE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CATALOGUE_VERSION_KEY)
+    if _index is None or version != _index_version:
+        entries = (
+            Specialization.objects.filter(doctors__user__is_active=True)
+            .distinct()
+            .values_list('id', 'name')
+        )
+        with primary_reads():
+            _index = SpecializationIndex(list(entries))
+        _index_version = version
+    return _index
+
+
+def invalidate_specialization_index():
+    # Every process compares this token on its next lookup and rebuilds.
+    transaction.on_commit(lambda: cache.set(CATALOGUE_VERSION_KEY, uuid.uuid4().hex, timeout=None))
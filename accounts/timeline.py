@@ -0,0 +1,188 @@
+import base64
+import json
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from appointments.models import Appointment
+from billing.models import Invoice
+from prescriptions.models import Prescription
+
+from .caching import cache_get, jittered
+from .fragments import fragment_versions
+from .pagination import DEFAULT_PAGE_SIZE
+from .routers import primary_reads
+
+TIMELINE_TTL = 60 * 60
+# Tie-break for events at the same instant, newest first: the invoice and
+# prescription come after the visit they belong to.
+EVENT_RANKS = {'appointment': 0, 'prescription': 1, 'invoice': 2}
+
+
+class TimelineCursorError(ValueError):
+    pass
+
+
+def encode_cursor(position):
+    at, rank, pk = position
+    return base64.urlsafe_b64encode(json.dumps([at.isoformat(), rank, pk]).encode()).decode()
+
+
+def decode_cursor(encoded):
+    try:
+        at, rank, pk = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        at = parse_datetime(at)
+        if at is None or timezone.is_naive(at) or rank not in EVENT_RANKS.values() or not isinstance(pk, int):
+            raise ValueError
+    except (TypeError, ValueError):
+        raise TimelineCursorError('Invalid cursor')
+    return at, rank, pk
+
+
+def _seek(kind, position, before, at_or_before, at_exactly):
+    # (at, rank, id) < (cursor at, rank, id), specialised for one event type
+    # so each source stays a plain range scan on its own ordering.
+    at, rank, pk = position
+    if EVENT_RANKS[kind] < rank:
+        return at_or_before(at)
+    if EVENT_RANKS[kind] > rank:
+        return before(at)
+    return before(at) | (at_exactly(at) & Q(pk__lt=pk))
+
+
+def _seek_created(field):
+    return (
+        lambda at: Q(**{f'{field}__lt': at}),
+        lambda at: Q(**{f'{field}__lte': at}),
+        lambda at: Q(**{field: at}),
+    )
+
+
+def _local(at):
+    at = timezone.localtime(at)
+    return at.date(), at.time()
+
+
+def _seek_visit():
+    # Appointments are ordered by their local (date, time) columns.
+    def before(at):
+        day, time = _local(at)
+        return Q(date__lt=day) | Q(date=day, time__lt=time)
+
+    def at_or_before(at):
+        day, time = _local(at)
+        return Q(date__lt=day) | Q(date=day, time__lte=time)
+
+    def at_exactly(at):
+        day, time = _local(at)
+        return Q(date=day, time=time)
+
+    return before, at_or_before, at_exactly
+
+
+def _doctor(doctor):
+    return {
+        'id': doctor.id,
+        'name': doctor.user.get_full_name() or doctor.user.username,
+        'specialization': doctor.specialization,
+    }
+
+
+def _appointment_event(appointment):
+    at = timezone.make_aware(datetime.combine(appointment.date, appointment.time))
+    return at, {
+        'type': 'appointment',
+        'id': appointment.id,
+        'status': appointment.status,
+        'reason': appointment.reason,
+        'doctor': _doctor(appointment.doctor),
+    }
+
+
+def _prescription_event(prescription):
+    return prescription.created_at, {
+        'type': 'prescription',
+        'id': prescription.id,
+        'appointment_id': prescription.appointment_id,
+        'diagnosis': prescription.diagnosis,
+        'medicines': prescription.medicines,
+        'notes': prescription.notes,
+        'doctor': _doctor(prescription.appointment.doctor),
+    }
+
+
+def _invoice_event(invoice):
+    return invoice.issued_at, {
+        'type': 'invoice',
+        'id': invoice.id,
+        'appointment_id': invoice.appointment_id,
+        'amount': str(invoice.amount),
+        'paid': invoice.paid,
+        'paid_at': invoice.paid_at.isoformat() if invoice.paid_at else None,
+        'doctor': _doctor(invoice.appointment.doctor),
+    }
+
+
+TIMELINE_SOURCES = (
+    (
+        'appointment',
+        lambda patient_id: Appointment.objects.filter(patient_id=patient_id)
+        .select_related('doctor__user')
+        .order_by('-date', '-time', '-id'),
+        _seek_visit(),
+        _appointment_event,
+    ),
+    (
+        'prescription',
+        lambda patient_id: Prescription.objects.filter(appointment__patient_id=patient_id)
+        .select_related('appointment__doctor__user')
+        .order_by('-created_at', '-id'),
+        _seek_created('created_at'),
+        _prescription_event,
+    ),
+    (
+        'invoice',
+        lambda patient_id: Invoice.objects.filter(appointment__patient_id=patient_id)
+        .select_related('appointment__doctor__user')
+        .order_by('-issued_at', '-id'),
+        _seek_created('issued_at'),
+        _invoice_event,
+    ),
+)
+
+
+def build_timeline_page(patient_id, position=None, limit=DEFAULT_PAGE_SIZE):
+    # One query per source, each reading at most limit + 1 rows past the
+    # cursor, then merged: the page costs the same however long the history.
+    events = []
+    for kind, queryset, seek, to_event in TIMELINE_SOURCES:
+        rows = queryset(patient_id)
+        if position is not None:
+            rows = rows.filter(_seek(kind, position, *seek))
+        for row in rows[:limit + 1]:
+            at, event = to_event(row)
+            events.append(((at, EVENT_RANKS[kind], row.pk), event))
+    events.sort(key=lambda item: item[0], reverse=True)
+
+    page = events[:limit]
+    results = [{**event, 'at': key[0].isoformat()} for key, event in page]
+    next_cursor = encode_cursor(page[-1][0]) if len(events) > limit else None
+    return {'results': results, 'next': next_cursor}
+
+
+def patient_timeline(patient_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    # Cached per page under the patient's fragment version (bumped by every
+    # appointment, prescription and invoice change of theirs) and the
+    # 'people' version (doctor names).
+    position = decode_cursor(cursor) if cursor else None
+    versions = fragment_versions('people', f'patient:{patient_id}')
+    key = ':'.join(['timeline', str(patient_id), cursor or 'first', str(limit), *versions])
+    page = cache_get(key)
+    if page is None:
+        with primary_reads():
+            page = build_timeline_page(patient_id, position, limit)
+        cache.set(key, page, jittered(TIMELINE_TTL))
+    return page
@@ -6,10 +6,10 @@ from .views import (
     DoctorViewSet,
     PatientViewSet,
     RegisterAPIView,
-    login_admin_view,
-    login_doctor_view,
+    SearchAPIView,
+    SpecializationAutocompleteAPIView,
     login_options_view,
-    login_patient_view,
+    login_portal_view,
     register_doctor_view,
     register_options_view,
     register_patient_view,
@@ -21,13 +21,15 @@ router.register('patients', PatientViewSet, basename='patient')
 
 urlpatterns = [
     path('login/options/', login_options_view, name='login-options'),
-    path('login/admin/', login_admin_view, name='login-admin'),
-    path('login/patient/', login_patient_view, name='login-patient'),
-    path('login/doctor/', login_doctor_view, name='login-doctor'),
+    path('login/admin/', login_portal_view, {'portal': 'admin'}, name='login-admin'),
+    path('login/patient/', login_portal_view, {'portal': 'patient'}, name='login-patient'),
+    path('login/doctor/', login_portal_view, {'portal': 'doctor'}, name='login-doctor'),
     path('register/options/', register_options_view, name='register-options'),
     path('register/patient/', register_patient_view, name='register-patient'),
     path('register/doctor/', register_doctor_view, name='register-doctor'),
     path('register/', RegisterAPIView.as_view(), name='register'),
     path('dashboard/', DashboardStatsAPIView.as_view(), name='dashboard-stats'),
+    path('search/', SearchAPIView.as_view(), name='search'),
+    path('specializations/', SpecializationAutocompleteAPIView.as_view(), name='specialization-autocomplete'),
     path('', include(router.urls)),
 ]
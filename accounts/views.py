@@ -1,24 +1,59 @@
+import json
 from datetime import date
 
-from django.core.cache import cache
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import login, logout
 from django.contrib import messages
 from django.utils import timezone
+from django.db import IntegrityError, router
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
 from django.shortcuts import redirect, render
-from django.db.models import Count, Sum
+from django.template.loader import render_to_string
+from django.db.models import Prefetch
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
+from appointments.counters import doctor_counter, patient_counter
 from appointments.models import Appointment
+from billing.aggregates import invoice_totals
 from billing.models import Invoice
-from prescriptions.models import Prescription
 
+from .aggregates import count_querysets
+from .approvals import approve_doctors, reject_doctors
+from .backends import check_email_credentials
+from .bulk import MAX_BULK_ITEMS
+from .concurrency import run_queries
+from .conditional import ConditionalGetViewSetMixin, collection_validators, portal_not_modified, set_validators
+from .dashboard import dashboard_payload, get_stats
+from .exports import EXPORT_DATASETS, EXPORT_FORMATS, EXPORT_WRITERS, ExportFilterError, export_queryset
+from .fieldsets import SparseFieldsetViewSetMixin
 from .forms import AppointmentBookForm, ContactQueryForm, DoctorRegisterForm, LoginForm, PatientRegisterForm
-from .models import ContactQuery, Doctor, Patient, User
+from .fragments import cached_fragment, render_fragment
+from .jobs import enqueue
+from .metrics import REGISTRY
+from .models import ContactQuery, Doctor, Job, Patient
+from .pagination import ProfileCursorPagination, keyset_page, parse_page_size
 from .permissions import IsAdminRole
-from .serializers import DoctorSerializer, PatientSerializer, RegisterSerializer, UserSerializer
+from .portals import PORTALS, portal_counts, run_portal_action
+from .search import search_rows
+from .serializers import DoctorSerializer, PatientSerializer, RegisterSerializer, SearchQuerySerializer, UserSerializer
+from .specializations import specialization_index
+from .timeline import TimelineCursorError, patient_timeline
+
+ADMIN_PATIENT_RECENT_APPOINTMENTS = 5
+ADMIN_RECENT_JOBS = 10
+# Admin page actions that only queue a background job (see accounts.jobs).
+ADMIN_JOB_ACTIONS = {
+    'recompute_dashboard': ('reconcile_dashboard', 'Dashboard counters will be recomputed in the background.'),
+    'refresh_billing': ('refresh_billing', 'Billing totals will be refreshed in the background.'),
+}
 
 
 class RegisterAPIView(APIView):
@@ -31,46 +66,75 @@ class RegisterAPIView(APIView):
         return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
 
 
-class DoctorViewSet(viewsets.ModelViewSet):
+class DoctorViewSet(ConditionalGetViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     serializer_class = DoctorSerializer
+    pagination_class = ProfileCursorPagination
     permission_classes = [IsAuthenticated, IsAdminRole]
 
     def get_queryset(self):
         return Doctor.objects.select_related('user').all()
 
 
-class PatientViewSet(viewsets.ModelViewSet):
+class PatientViewSet(ConditionalGetViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     serializer_class = PatientSerializer
+    pagination_class = ProfileCursorPagination
     permission_classes = [IsAuthenticated, IsAdminRole]
 
     def get_queryset(self):
         return Patient.objects.select_related('user').all()
 
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        # Appointments, prescriptions and invoices as one newest-first stream.
+        patient = self.get_object()
+        try:
+            page = patient_timeline(
+                patient.pk,
+                request.query_params.get('cursor'),
+                parse_page_size(request.query_params.get('page_size')),
+            )
+        except TimelineCursorError as exc:
+            raise NotFound(str(exc))
+        next_link = None
+        if page['next'] is not None:
+            next_link = replace_query_param(request.build_absolute_uri(), 'cursor', page['next'])
+        return Response({'patient': patient.pk, 'next': next_link, 'results': page['results']})
+
 
 class DashboardStatsAPIView(APIView):
     permission_classes = [IsAuthenticated, IsAdminRole]
 
     def get(self, request):
-        cache_key = 'dashboard_stats'
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data)
-
-        appointment_counts = Appointment.objects.values('status').annotate(total=Count('id'))
-        revenue = Invoice.objects.filter(paid=True).aggregate(total_revenue=Sum('amount'))
-
-        data = {
-            'users': {
-                'doctors': Doctor.objects.count(),
-                'patients': Patient.objects.count(),
-            },
-            'appointments_by_status': list(appointment_counts),
-            'revenue': revenue['total_revenue'] or 0,
-            'paid_invoices': Invoice.objects.filter(paid=True).count(),
-            'unpaid_invoices': Invoice.objects.filter(paid=False).count(),
-        }
-        cache.set(cache_key, data, timeout=300)
-        return Response(data)
+        return Response(dashboard_payload(get_stats()))
+
+
+class SearchAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def get(self, request):
+        query = SearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        page_size = parse_page_size(request.query_params.get('page_size'))
+        # One extra hit tells whether there is a next page without a COUNT.
+        rows = search_rows(params['type'], params['q'], page_size + 1, (params['page'] - 1) * page_size) or []
+        return Response(
+            {
+                'type': params['type'],
+                'page': params['page'],
+                'next': params['page'] + 1 if len(rows) > page_size else None,
+                'results': rows[:page_size],
+            }
+        )
+
+
+class SpecializationAutocompleteAPIView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        matches = specialization_index().search(request.query_params.get('q', ''))
+        return Response({'results': [{'id': specialization_id, 'name': name} for specialization_id, name in matches]})
 
 
 def register_options_view(request):
@@ -121,79 +185,53 @@ def register_doctor_view(request):
     return render(request, 'register_doctor.html', {'form': form})
 
 
-def login_patient_view(request):
+LOGIN_PORTALS = {
+    'patient': {
+        'template': 'login_patient.html',
+        'redirect': '/patient/',
+        'allows': lambda user: user.role == 'PATIENT',
+        'wrong_portal': 'This is patient login. Please use the correct portal.',
+        'inactive': 'Your account is inactive. Please contact support.',
+        'success': 'Logged in successfully as patient.',
+    },
+    'doctor': {
+        'template': 'login_doctor.html',
+        'redirect': '/doctor/',
+        'allows': lambda user: user.role == 'DOCTOR',
+        'wrong_portal': 'This is doctor login. Please use the correct portal.',
+        'inactive': 'Doctor account approval from admin is pending.',
+        'success': 'Logged in successfully as doctor.',
+    },
+    'admin': {
+        'template': 'login_admin.html',
+        'redirect': '/admin/',
+        'allows': lambda user: user.is_staff or user.is_superuser or user.role == 'ADMIN',
+        'wrong_portal': 'This is admin login. Use the correct portal.',
+        'inactive': 'Your account is inactive.',
+        'success': 'Logged in successfully as admin.',
+    },
+}
+
+
+def login_portal_view(request, portal):
+    config = LOGIN_PORTALS[portal]
     if request.method == 'POST':
         form = LoginForm(request.POST)
         if form.is_valid():
-            email = form.cleaned_data['email']
-            password = form.cleaned_data['password']
-            matched_user = User.objects.filter(email__iexact=email).first()
-            login_username = matched_user.username if matched_user else email
-            user = authenticate(request, username=login_username, password=password)
+            user = check_email_credentials(form.cleaned_data['email'], form.cleaned_data['password'])
             if user is None:
                 messages.error(request, 'Invalid credentials. Please try again.')
-            elif user.role != 'PATIENT':
-                messages.error(request, 'This is patient login. Please use the correct portal.')
+            elif not config['allows'](user):
+                messages.error(request, config['wrong_portal'])
             elif not user.is_active:
-                messages.error(request, 'Your account is inactive. Please contact support.')
+                messages.error(request, config['inactive'])
             else:
-                login(request, user)
-                messages.success(request, 'Logged in successfully as patient.')
-                return redirect('/patient/')
+                login(request, user, backend='accounts.backends.EmailBackend')
+                messages.success(request, config['success'])
+                return redirect(config['redirect'])
     else:
         form = LoginForm()
-    return render(request, 'login_patient.html', {'form': form})
-
-
-def login_doctor_view(request):
-    if request.method == 'POST':
-        form = LoginForm(request.POST)
-        if form.is_valid():
-            email = form.cleaned_data['email']
-            password = form.cleaned_data['password']
-            matched_user = User.objects.filter(email__iexact=email).first()
-            login_username = matched_user.username if matched_user else email
-            user = authenticate(request, username=login_username, password=password)
-            if user is None:
-                messages.error(request, 'Invalid credentials. Please try again.')
-            elif user.role != 'DOCTOR':
-                messages.error(request, 'This is doctor login. Please use the correct portal.')
-            elif not user.is_active:
-                messages.error(request, 'Doctor account approval from admin is pending.')
-            else:
-                login(request, user)
-                messages.success(request, 'Logged in successfully as doctor.')
-                return redirect('/doctor/')
-    else:
-        form = LoginForm()
-    return render(request, 'login_doctor.html', {'form': form})
-
-
-def login_admin_view(request):
-    if request.method == 'POST':
-        form = LoginForm(request.POST)
-        if form.is_valid():
-            email = form.cleaned_data['email']
-            password = form.cleaned_data['password']
-            matched_user = User.objects.filter(email__iexact=email).first()
-            login_username = matched_user.username if matched_user else email
-            user = authenticate(request, username=login_username, password=password)
-            if user is None:
-                messages.error(request, 'Invalid credentials. Please try again.')
-            elif not user.is_active:
-                messages.error(request, 'Your account is inactive.')
-            elif not (user.is_staff or user.is_superuser or user.role == 'ADMIN'):
-                messages.error(request, 'This is admin login. Use the correct portal.')
-            else:
-                if user.role == 'ADMIN' and not user.is_staff:
-                    user.is_staff = True
-                    user.save(update_fields=['is_staff'])
-                login(request, user)
-                messages.success(request, 'Logged in successfully as admin.')
-                return redirect('/admin/')
-    else:
-        form = LoginForm()
-    return render(request, 'login_admin.html', {'form': form})
+    return render(request, config['template'], {'form': form})
 
 
 def admin_page_view(request):
@@ -211,19 +249,25 @@ def admin_page_view(request):
         if action == 'approve_doctor':
             doctor_id = request.POST.get('doctor_id')
             doctor = Doctor.objects.select_related('user').filter(id=doctor_id).first()
-            if doctor is not None:
-                doctor.user.is_active = True
-                doctor.user.save(update_fields=['is_active'])
+            if doctor is not None and approve_doctors([doctor.id]):
                 messages.success(request, f'Doctor {doctor.user.get_full_name() or doctor.user.username} approved successfully.')
             return redirect('/admin/')
 
         if action == 'reject_doctor':
             doctor_id = request.POST.get('doctor_id')
             doctor = Doctor.objects.select_related('user').filter(id=doctor_id).first()
-            if doctor is not None:
+            if doctor is not None and reject_doctors([doctor.id]):
+                # Removing the account cascades through every appointment,
+                # invoice and prescription, so a worker does it.
                 doctor_name = doctor.user.get_full_name() or doctor.user.username
-                doctor.user.delete()
-                messages.success(request, f'Doctor {doctor_name} rejected and removed successfully.')
+                enqueue('reject_doctors', {'doctor_ids': [doctor.id]}, user=request.user)
+                messages.success(request, f'Doctor {doctor_name} rejected; their records are being removed in the background.')
+            return redirect('/admin/')
+
+        if action in ADMIN_JOB_ACTIONS:
+            kind, message = ADMIN_JOB_ACTIONS[action]
+            enqueue(kind, user=request.user)
+            messages.success(request, message)
             return redirect('/admin/')
 
         query_id = request.POST.get('query_id')
@@ -237,26 +281,129 @@ def admin_page_view(request):
                 messages.success(request, 'Reply saved successfully.')
         return redirect('/admin/')
 
-    queries = ContactQuery.objects.all()
-    doctors = Doctor.objects.select_related('user').all()
-    pending_doctors = doctors.filter(user__is_active=False)
-    patients = Patient.objects.select_related('user').prefetch_related('appointments__doctor__user').all()
-    appointments = Appointment.objects.select_related('doctor__user', 'patient__user').prefetch_related('invoice').all()
-    
-    context = {
-        'doctors': doctors,
-        'pending_doctors': pending_doctors,
-        'patients': patients,
-        'appointments': appointments,
-        'queries': queries,
-        'doctor_count': doctors.count(),
-        'pending_doctor_count': pending_doctors.count(),
-        'patient_count': patients.count(),
-        'appointment_count': appointments.count(),
-        'query_count': queries.count(),
-        'replied_count': queries.exclude(admin_reply='').count(),
-    }
-    return render(request, 'admin.html', context)
+    counts = count_querysets(
+        doctor_count=Doctor.objects.all(),
+        pending_doctor_count=Doctor.objects.filter(user__role='DOCTOR', user__is_active=False, rejected_at__isnull=True),
+        patient_count=Patient.objects.all(),
+        appointment_count=Appointment.objects.all(),
+        query_count=ContactQuery.objects.all(),
+        replied_count=ContactQuery.objects.exclude(admin_reply=''),
+    )
+    # Jobs admins started; the system's own (rollup refreshes) are left out.
+    jobs = Job.objects.filter(created_by__isnull=False).order_by('-id')[:ADMIN_RECENT_JOBS]
+    return render(request, 'admin.html', {**counts, 'jobs': jobs})
+
+
+def admin_doctors_bulk_view(request):
+    # Multi-select approve/reject from the pending doctors section. Answers
+    # with JSON the page applies in place instead of a redirect and reload.
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Please login as admin first.'}, status=401)
+
+    if not (request.user.is_staff or request.user.is_superuser or request.user.role == 'ADMIN'):
+        return JsonResponse({'detail': 'You are not authorized to access admin page.'}, status=403)
+
+    if request.method != 'POST':
+        return JsonResponse({'detail': 'Method not allowed.'}, status=405)
+
+    action = request.POST.get('action')
+    try:
+        doctor_ids = sorted({int(value) for value in request.POST.getlist('doctor_ids')})
+    except ValueError:
+        return JsonResponse({'detail': 'doctor_ids must be integers.'}, status=400)
+    if action not in ('approve', 'reject') or not doctor_ids:
+        return JsonResponse({'detail': 'Choose approve or reject and at least one doctor.'}, status=400)
+    if len(doctor_ids) > MAX_BULK_ITEMS:
+        return JsonResponse({'detail': f'At most {MAX_BULK_ITEMS} doctors per request.'}, status=400)
+
+    if action == 'approve':
+        handled = approve_doctors(doctor_ids)
+        job = None
+        message = f'{len(handled)} doctor(s) approved.'
+    else:
+        # Deleting the accounts cascades through their records, so a worker
+        # does it in batches; they are marked rejected and inactive meanwhile.
+        handled = reject_doctors(doctor_ids)
+        job = enqueue('reject_doctors', {'doctor_ids': handled}, user=request.user) if handled else None
+        message = f'{len(handled)} doctor(s) rejected; their records are being removed in the background.'
+    return JsonResponse(
+        {
+            'action': action,
+            'doctor_ids': handled,
+            'skipped': sorted(set(doctor_ids) - set(handled)),
+            'job': job.id if job else None,
+            'message': message,
+        }
+    )
+
+
+ADMIN_SECTIONS = {
+    'pending_doctors': {
+        'queryset': lambda: Doctor.objects.select_related('user').filter(user__role='DOCTOR', user__is_active=False, rejected_at__isnull=True),
+        'key': 'id',
+        'template': 'partials/admin_pending_doctors.html',
+        'scopes': ('people',),
+    },
+    'doctors': {
+        'queryset': lambda: Doctor.objects.select_related('user'),
+        'key': 'id',
+        'template': 'partials/admin_doctors.html',
+        'scopes': ('people',),
+    },
+    'patients': {
+        'queryset': lambda: Patient.objects.select_related('user').prefetch_related(
+            Prefetch(
+                'appointments',
+                queryset=Appointment.objects.select_related('doctor__user').order_by('-date', '-time')[:ADMIN_PATIENT_RECENT_APPOINTMENTS],
+                to_attr='recent_appointments',
+            )
+        ),
+        'key': 'id',
+        'template': 'partials/admin_patients.html',
+        'scopes': ('people', 'appointments'),
+    },
+    'appointments': {
+        'queryset': lambda: Appointment.objects.select_related('doctor__user', 'patient__user', 'invoice'),
+        'key': '-id',
+        'template': 'partials/admin_appointments.html',
+        'scopes': ('people', 'appointments'),
+    },
+    'queries': {
+        'queryset': lambda: ContactQuery.objects.all(),
+        'key': '-id',
+        'template': 'partials/admin_queries.html',
+        'scopes': ('queries',),
+    },
+}
+
+
+def admin_section_view(request, section):
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Please login as admin first.'}, status=401)
+
+    if not (request.user.is_staff or request.user.is_superuser or request.user.role == 'ADMIN'):
+        return JsonResponse({'detail': 'You are not authorized to access admin page.'}, status=403)
+
+    config = ADMIN_SECTIONS.get(section)
+    if config is None:
+        return JsonResponse({'detail': 'Unknown section.'}, status=404)
+
+    after = request.GET.get('after')
+    if after is not None:
+        try:
+            after = int(after)
+        except ValueError:
+            return JsonResponse({'detail': 'Invalid cursor.'}, status=400)
+
+    limit = parse_page_size(request.GET.get('limit'))
+
+    def render_page():
+        items, next_cursor = keyset_page(config['queryset'](), config['key'], after=after, limit=limit)
+        html = render_fragment(config['template'], {'items': items})
+        return json.dumps({'html': html, 'count': len(items), 'next': next_cursor})
+
+    body = cached_fragment(request, f'admin-section:{section}:{after}:{limit}', config['scopes'], render_page)
+    return HttpResponse(body, content_type='application/json')
 
 
 def admin_billing_history_view(request):
@@ -268,25 +415,113 @@ def admin_billing_history_view(request):
         messages.error(request, 'You are not authorized to access this page.')
         return redirect('/login/')
 
-    # Get all invoices with related data
-    invoices = Invoice.objects.select_related('appointment__patient__user', 'appointment__doctor__user').all()
-    
-    # Calculate totals
-    total_paid = invoices.filter(paid=True).aggregate(total=Sum('amount'))['total'] or 0
-    total_pending = invoices.filter(paid=False).aggregate(total=Sum('amount'))['total'] or 0
-    total_all = total_paid + total_pending
-    
+    # The invoice list and the totals are independent reads.
+    invoices, totals = run_queries(
+        lambda: list(Invoice.objects.select_related('appointment__patient__user', 'appointment__doctor__user').all()),
+        invoice_totals,
+    )
+
     context = {
         'invoices': invoices,
-        'total_paid': total_paid,
-        'total_pending': total_pending,
-        'total_all': total_all,
-        'paid_count': invoices.filter(paid=True).count(),
-        'pending_count': invoices.filter(paid=False).count(),
+        'total_paid': totals['total_revenue'],
+        'total_pending': totals['pending_amount'],
+        'total_all': totals['total_revenue'] + totals['pending_amount'],
+        'paid_count': totals['paid_count'],
+        'pending_count': totals['unpaid_count'],
     }
     return render(request, 'admin_billing_history.html', context)
 
 
+def admin_export_view(request, dataset, fmt):
+    if not request.user.is_authenticated:
+        messages.error(request, 'Please login as admin first.')
+        return redirect('/login/admin/')
+
+    if not (request.user.is_staff or request.user.is_superuser or request.user.role == 'ADMIN'):
+        messages.error(request, 'You are not authorized to access this page.')
+        return redirect('/login/')
+
+    if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+        raise Http404('Unknown export.')
+
+    try:
+        rows = export_queryset(dataset, request.GET)
+    except ExportFilterError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    if request.method == 'POST':
+        # Written to a file by a worker; the admin page links to it when done.
+        filters = {name: request.GET[name] for name in ('start', 'end', 'paid') if name in request.GET}
+        enqueue('export', {'dataset': dataset, 'fmt': fmt, 'filters': filters}, user=request.user)
+        messages.success(request, f'The {dataset} export is being prepared in the background.')
+        return redirect('/admin/')
+
+    # The body is produced after the middleware has returned, so pin the
+    # database this request was routed to now.
+    rows = rows.using(router.db_for_read(rows.model))
+
+    response = StreamingHttpResponse(EXPORT_WRITERS[fmt](dataset, rows), content_type=EXPORT_FORMATS[fmt])
+    filename = f'{dataset}-{timezone.localdate().isoformat()}.{fmt}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _job_payload(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'progress_message': job.progress_message,
+        'attempts': job.attempts,
+        'result': job.result,
+        # The traceback stays in the database; its last line says what failed.
+        'error': job.error.strip().splitlines()[-1] if job.error.strip() else '',
+        'download': f'/admin/jobs/{job.id}/download/' if job.status == 'SUCCEEDED' and (job.result or {}).get('file') else None,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+    }
+
+
+def admin_job_view(request, job_id):
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Please login as admin first.'}, status=401)
+
+    if not (request.user.is_staff or request.user.is_superuser or request.user.role == 'ADMIN'):
+        return JsonResponse({'detail': 'You are not authorized to access admin page.'}, status=403)
+
+    job = Job.objects.filter(id=job_id).first()
+    if job is None:
+        return JsonResponse({'detail': 'Unknown job.'}, status=404)
+    return JsonResponse(_job_payload(job))
+
+
+def admin_job_download_view(request, job_id):
+    if not request.user.is_authenticated:
+        messages.error(request, 'Please login as admin first.')
+        return redirect('/login/admin/')
+
+    if not (request.user.is_staff or request.user.is_superuser or request.user.role == 'ADMIN'):
+        messages.error(request, 'You are not authorized to access this page.')
+        return redirect('/login/')
+
+    job = Job.objects.filter(id=job_id, status='SUCCEEDED').first()
+    name = (job.result or {}).get('file') if job is not None else None
+    if not name or not default_storage.exists(name):
+        raise Http404('No file for this job.')
+    return FileResponse(default_storage.open(name), as_attachment=True, filename=name.rsplit('/', 1)[-1])
+
+
+def metrics_view(request):
+    authorization = request.headers.get('Authorization', '')
+    token_ok = bool(settings.METRICS_TOKEN) and constant_time_compare(authorization, f'Bearer {settings.METRICS_TOKEN}')
+    user = request.user
+    admin_ok = user.is_authenticated and (user.is_staff or user.is_superuser or user.role == 'ADMIN')
+    if not (token_ok or admin_ok):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 def book_appointment_gate_view(request):
     if not request.user.is_authenticated:
         return render(request, 'book_appointment_gate.html')
@@ -304,11 +539,14 @@ def book_appointment_gate_view(request):
     specialization_filter = request.GET.get('specialization', '')
     form = AppointmentBookForm()
     
+    index = specialization_index()
+
     # Filter doctors by specialization if provided
     if specialization_filter:
+        specialty_ids = [specialization_id for specialization_id, _ in index.search(specialization_filter, limit=None)]
         form.fields['doctor'].queryset = Doctor.objects.select_related('user').filter(
             user__is_active=True,
-            specialization__icontains=specialization_filter
+            specialty_id__in=specialty_ids,
         )
     
     if request.method == 'POST':
@@ -317,12 +555,17 @@ def book_appointment_gate_view(request):
             appointment = form.save(commit=False)
             appointment.patient = patient_profile
             appointment.status = 'SCHEDULED'
-            appointment.save()
-            messages.success(request, 'Appointment booked successfully! Awaiting doctor confirmation.')
-            return redirect('/patient/')
+            try:
+                appointment.save()
+            except IntegrityError:
+                # Another patient booked the same slot between validation and save.
+                form.add_error('time', 'This time slot was just booked by someone else. Please pick another slot.')
+            else:
+                messages.success(request, 'Appointment booked successfully! Awaiting doctor confirmation.')
+                return redirect('/patient/')
     
-    # Get all unique specializations for the datalist
-    specializations = Doctor.objects.filter(user__is_active=True).values_list('specialization', flat=True).distinct()
+    # Specializations for the datalist come from the in-memory catalogue
+    specializations = [name for _, name in index.entries]
     
     context = {
         'form': form,
@@ -365,72 +608,43 @@ def doctor_page_view(request):
 
     if request.method == 'POST':
         action = request.POST.get('action')
-
-        if action == 'confirm_appointment':
-            appt_id = request.POST.get('appointment_id')
-            appointment = Appointment.objects.filter(id=appt_id, doctor=doctor_profile).first()
-            if appointment:
-                appointment.status = 'COMPLETED'
-                appointment.save(update_fields=['status'])
-                messages.success(request, f'Appointment #{appt_id} confirmed successfully.')
-            return redirect('/doctor/')
-
-        if action == 'reject_appointment':
-            appt_id = request.POST.get('appointment_id')
-            appointment = Appointment.objects.filter(id=appt_id, doctor=doctor_profile).first()
-            if appointment:
-                appointment.status = 'CANCELLED'
-                appointment.save(update_fields=['status'])
-                messages.success(request, f'Appointment #{appt_id} rejected successfully.')
-            return redirect('/doctor/')
-
-        if action == 'create_prescription':
-            appt_id = request.POST.get('appointment_id')
-            diagnosis = request.POST.get('diagnosis', '').strip()
-            medicines = request.POST.get('medicines', '').strip()
-            notes = request.POST.get('notes', '').strip()
-            appointment = Appointment.objects.filter(id=appt_id, doctor=doctor_profile).first()
-            if appointment and diagnosis and medicines:
-                Prescription.objects.update_or_create(
-                    appointment=appointment,
-                    defaults={'diagnosis': diagnosis, 'medicines': medicines, 'notes': notes}
-                )
-                messages.success(request, f'Prescription saved for Appointment #{appt_id}.')
+        if action in PORTALS['doctor']['actions']:
+            _, level, message = run_portal_action('doctor', doctor_profile, action, request.POST.get('appointment_id'), request.POST)
+            getattr(messages, level)(request, message)
             return redirect('/doctor/')
 
-        if action == 'create_bill':
-            appt_id = request.POST.get('appointment_id')
-            amount = request.POST.get('amount', '').strip()
-            appointment = Appointment.objects.filter(id=appt_id, doctor=doctor_profile).first()
-            if appointment and amount:
-                try:
-                    amount_decimal = float(amount)
-                    Invoice.objects.update_or_create(
-                        appointment=appointment,
-                        defaults={'amount': amount_decimal, 'paid': False}
-                    )
-                    messages.success(request, f'Bill created for Appointment #{appt_id}.')
-                except ValueError:
-                    messages.error(request, 'Invalid amount entered.')
-            return redirect('/doctor/')
+    etag, last_modified = collection_validators(
+        Appointment.objects.filter(doctor=doctor_profile),
+        related=('invoice', 'prescription'),
+        extra=(request.user.pk, request.user.get_full_name(), doctor_profile.updated_at, request.META.get('CSRF_COOKIE')),
+    )
+    response = portal_not_modified(request, etag)
+    if response is not None:
+        return set_validators(response, etag, last_modified)
+
+    def render_appointments():
+        appointments = list(
+            Appointment.objects.filter(doctor=doctor_profile).select_related('patient__user').prefetch_related('prescription', 'invoice')
+        )
+        return render_fragment('partials/doctor_appointments.html', {
+            'scheduled_appointments': [appt for appt in appointments if appt.status == 'SCHEDULED'],
+            'completed_appointments': [appt for appt in appointments if appt.status == 'COMPLETED'],
+            'cancelled_appointments': [appt for appt in appointments if appt.status == 'CANCELLED'],
+        })
 
-    appointments = Appointment.objects.filter(doctor=doctor_profile).select_related('patient__user').prefetch_related('prescription', 'invoice')
-    scheduled_appointments = appointments.filter(status='SCHEDULED')
-    completed_appointments = appointments.filter(status='COMPLETED')
-    cancelled_appointments = appointments.filter(status='CANCELLED')
+    counter = doctor_counter(doctor_profile)
 
     context = {
         'doctor': doctor_profile,
-        'appointments': appointments,
-        'scheduled_appointments': scheduled_appointments,
-        'completed_appointments': completed_appointments,
-        'cancelled_appointments': cancelled_appointments,
-        'total_appointments': appointments.count(),
-        'scheduled_count': scheduled_appointments.count(),
-        'completed_count': completed_appointments.count(),
-        'cancelled_count': cancelled_appointments.count(),
+        'appointments_html': cached_fragment(
+            request, f'doctor-appointments:{doctor_profile.pk}', (f'doctor:{doctor_profile.pk}',), render_appointments
+        ),
+        'total_appointments': counter.total,
+        'scheduled_count': counter.scheduled,
+        'completed_count': counter.completed,
+        'cancelled_count': counter.cancelled,
     }
-    return render(request, 'doctor.html', context)
+    return set_validators(render(request, 'doctor.html', context), etag, last_modified)
 
 
 def patient_page_view(request):
@@ -450,49 +664,80 @@ def patient_page_view(request):
 
     if request.method == 'POST':
         action = request.POST.get('action')
-
-        if action == 'cancel_appointment':
-            appt_id = request.POST.get('appointment_id')
-            appointment = Appointment.objects.filter(id=appt_id, patient=patient_profile).first()
-            if appointment:
-                if appointment.status == 'CANCELLED':
-                    messages.error(request, 'Appointment is already cancelled.')
-                else:
-                    appointment.status = 'CANCELLED'
-                    appointment.save(update_fields=['status'])
-                    messages.success(request, f'Appointment #{appt_id} cancelled successfully.')
+        if action in PORTALS['patient']['actions']:
+            _, level, message = run_portal_action('patient', patient_profile, action, request.POST.get('appointment_id'), request.POST)
+            getattr(messages, level)(request, message)
             return redirect('/patient/')
 
-        if action == 'pay_bill':
-            appt_id = request.POST.get('appointment_id')
-            appointment = Appointment.objects.filter(id=appt_id, patient=patient_profile).first()
-            if appointment and hasattr(appointment, 'invoice'):
-                invoice = appointment.invoice
-                if not invoice.paid:
-                    invoice.paid = True
-                    invoice.save(update_fields=['paid'])
-                    messages.success(request, f'Payment of ${invoice.amount} received successfully for Appointment #{appt_id}.')
-                else:
-                    messages.error(request, 'This appointment has already been paid.')
-            return redirect('/patient/')
+    etag, last_modified = collection_validators(
+        Appointment.objects.filter(patient=patient_profile),
+        related=('invoice', 'prescription'),
+        extra=(request.user.pk, request.user.get_full_name(), patient_profile.updated_at, request.META.get('CSRF_COOKIE')),
+    )
+    response = portal_not_modified(request, etag)
+    if response is not None:
+        return set_validators(response, etag, last_modified)
+
+    def render_appointments():
+        appointments = list(
+            Appointment.objects.filter(patient=patient_profile).select_related('doctor__user').prefetch_related('prescription', 'invoice')
+        )
+        return render_fragment('partials/patient_appointments.html', {
+            'scheduled_appointments': [appt for appt in appointments if appt.status == 'SCHEDULED'],
+            'completed_appointments': [appt for appt in appointments if appt.status == 'COMPLETED'],
+            'cancelled_appointments': [appt for appt in appointments if appt.status == 'CANCELLED'],
+        })
 
-    appointments = Appointment.objects.filter(patient=patient_profile).select_related('doctor__user').prefetch_related('prescription', 'invoice')
-    scheduled_appointments = appointments.filter(status='SCHEDULED')
-    completed_appointments = appointments.filter(status='COMPLETED')
-    cancelled_appointments = appointments.filter(status='CANCELLED')
+    counter = patient_counter(patient_profile)
 
     context = {
         'patient': patient_profile,
-        'appointments': appointments,
-        'scheduled_appointments': scheduled_appointments,
-        'completed_appointments': completed_appointments,
-        'cancelled_appointments': cancelled_appointments,
-        'total_appointments': appointments.count(),
-        'scheduled_count': scheduled_appointments.count(),
-        'completed_count': completed_appointments.count(),
-        'cancelled_count': cancelled_appointments.count(),
+        'appointments_html': cached_fragment(
+            request, f'patient-appointments:{patient_profile.pk}', (f'patient:{patient_profile.pk}',), render_appointments
+        ),
+        'total_appointments': counter.total,
+        'scheduled_count': counter.scheduled,
+        'completed_count': counter.completed,
+        'cancelled_count': counter.cancelled,
     }
-    return render(request, 'patient.html', context)
+    return set_validators(render(request, 'patient.html', context), etag, last_modified)
+
+
+def portal_appointment_action_view(request, portal, appointment_id, action):
+    # One card action of the doctor/patient page as JSON: the re-rendered
+    # card and the owner's counters, applied in place by the page instead of
+    # a redirect and a full reload.
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': f'Please login as {portal} first.'}, status=401)
+
+    if request.user.role != portal.upper():
+        return JsonResponse({'detail': f'You are not authorized to access {portal} page.'}, status=403)
+
+    try:
+        owner = getattr(request.user, f'{portal}_profile')
+    except (Doctor.DoesNotExist, Patient.DoesNotExist):
+        return JsonResponse({'detail': f'{portal.capitalize()} profile not found.'}, status=403)
+
+    if request.method != 'POST':
+        return JsonResponse({'detail': 'Method not allowed.'}, status=405)
+
+    if action not in PORTALS[portal]['actions']:
+        return JsonResponse({'detail': 'Unknown action.'}, status=404)
+
+    appointment, level, message = run_portal_action(portal, owner, action, appointment_id, request.POST)
+    if appointment is None:
+        return JsonResponse({'detail': message}, status=404)
+    if level == 'error':
+        return JsonResponse({'detail': message}, status=400)
+    return JsonResponse(
+        {
+            'appointment_id': appointment.id,
+            'status': appointment.status,
+            'html': render_to_string(PORTALS[portal]['card'], {'appt': appointment}, request=request),
+            'counts': portal_counts(portal, owner),
+            'message': message,
+        }
+    )
 
 
 def doctor_billing_view(request):
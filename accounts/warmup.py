@@ -0,0 +1,61 @@
+import logging
+import time
+from pathlib import Path
+
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import Resolver404, get_resolver, resolve
+
+from billing.aggregates import invoice_totals
+
+from .dashboard import get_stats
+from .specializations import specialization_index
+
+logger = logging.getLogger(__name__)
+
+
+def _prime_urls():
+    # A path that matches nothing makes the resolver compile every pattern;
+    # reverse_dict builds the lookup table used by reverse() and {% url %}.
+    try:
+        resolve('/__warm-up__/')
+    except Resolver404:
+        pass
+    get_resolver().reverse_dict
+
+
+def _prime_templates():
+    # The cached template loader keeps what it has compiled for the life of
+    # the process, so parsing the project templates once here is enough.
+    count = 0
+    for engine in engines.all():
+        for directory in getattr(engine, 'dirs', []):
+            for path in Path(directory).rglob('*.html'):
+                try:
+                    engine.get_template(path.relative_to(directory).as_posix())
+                except (TemplateDoesNotExist, TemplateSyntaxError):
+                    logger.exception('Could not warm template %s', path)
+                    continue
+                count += 1
+    return count
+
+
+def _prime_connections():
+    # Fails fast on a bad DATABASE_URL and, with DATABASE_POOL, opens the
+    # pool's min_size connections up front.
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+def warm_up():
+    started = time.perf_counter()
+    _prime_urls()
+    templates = _prime_templates()
+    _prime_connections()
+    specialization_index()
+    get_stats()
+    invoice_totals()
+    # Requests run on other threads with their own connections; hand these
+    # back (to the pool, when there is one).
+    connections.close_all()
+    logger.info('Worker warmed up in %.0f ms (%d templates).', (time.perf_counter() - started) * 1000, templates)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Appointment
+from .models import Appointment, DoctorWorkingHours
 
 
 @admin.register(Appointment)
@@ -8,3 +8,10 @@ class AppointmentAdmin(admin.ModelAdmin):
     list_display = ('id', 'doctor', 'patient', 'date', 'time', 'status')
     list_filter = ('status', 'date')
     search_fields = ('doctor__user__username', 'patient__user__username')
+
+
+@admin.register(DoctorWorkingHours)
+class DoctorWorkingHoursAdmin(admin.ModelAdmin):
+    list_display = ('id', 'doctor', 'weekday', 'start_time', 'end_time', 'slot_minutes')
+    list_filter = ('weekday',)
+    search_fields = ('doctor__user__username',)
@@ -0,0 +1,90 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+
+from accounts.routers import primary_reads
+
+from .models import Appointment, DoctorAppointmentCounter, PatientAppointmentCounter
+
+STATUS_FIELDS = {
+    'SCHEDULED': 'scheduled',
+    'COMPLETED': 'completed',
+    'CANCELLED': 'cancelled',
+}
+
+# (counter model, owner column, index into Appointment.counter_state())
+COUNTERS = (
+    (DoctorAppointmentCounter, 'doctor_id', 0),
+    (PatientAppointmentCounter, 'patient_id', 1),
+)
+
+
+def counter_aggregates():
+    aggregates = {field: Count('id', filter=Q(status=status)) for status, field in STATUS_FIELDS.items()}
+    aggregates['total'] = Count('id')
+    return aggregates
+
+
+def rebuild_counter(counter_model, owner_field, owner_id):
+    with primary_reads():
+        values = Appointment.objects.filter(**{owner_field: owner_id}).aggregate(**counter_aggregates())
+    counter, _ = counter_model.objects.update_or_create(**{owner_field: owner_id}, defaults=values)
+    return counter
+
+
+def doctor_counter(doctor):
+    counter = DoctorAppointmentCounter.objects.filter(doctor=doctor).first()
+    return counter or rebuild_counter(DoctorAppointmentCounter, 'doctor_id', doctor.pk)
+
+
+def patient_counter(patient):
+    counter = PatientAppointmentCounter.objects.filter(patient=patient).first()
+    return counter or rebuild_counter(PatientAppointmentCounter, 'patient_id', patient.pk)
+
+
+def _owner_deltas(previous, current, index):
+    deltas = defaultdict(Counter)
+    for state, sign in ((previous, -1), (current, 1)):
+        if state is None or state[index] is None:
+            continue
+        owner_deltas = deltas[state[index]]
+        owner_deltas['total'] += sign
+        field = STATUS_FIELDS.get(state[2])
+        if field:
+            owner_deltas[field] += sign
+    return {owner: {field: delta for field, delta in fields.items() if delta} for owner, fields in deltas.items()}
+
+
+def record_appointment_change(previous, current):
+    # previous/current are Appointment.counter_state() tuples; None means the
+    # row did not exist before (create) or no longer exists (delete).
+    record_appointment_changes([(previous, current)])
+
+
+def record_appointment_changes(changes):
+    # Sums the deltas of many (previous, current) pairs so a bulk write
+    # issues one UPDATE per affected doctor/patient rather than per row.
+    changes = list(changes)
+    for counter_model, owner_field, index in COUNTERS:
+        totals = defaultdict(Counter)
+        for previous, current in changes:
+            for owner_id, deltas in _owner_deltas(previous, current, index).items():
+                totals[owner_id].update(deltas)
+        for owner_id, deltas in totals.items():
+            deltas = {field: delta for field, delta in deltas.items() if delta}
+            if not deltas:
+                continue
+            changes_sql = {field: Greatest(F(field) + delta, Value(0)) for field, delta in deltas.items()}
+            updated = counter_model.objects.filter(**{owner_field: owner_id}).update(**changes_sql)
+            # A missing row is built from the table on the next read; only
+            # build it eagerly for saves, never while the owner may be
+            # mid-cascade-delete.
+            if not updated and deltas.get('total', 0) >= 0:
+                rebuild_counter(counter_model, owner_field, owner_id)
+
+
+def rebuild_owner_counters(state):
+    for counter_model, owner_field, index in COUNTERS:
+        if state[index] is not None:
+            rebuild_counter(counter_model, owner_field, state[index])
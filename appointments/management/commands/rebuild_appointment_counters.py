@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from appointments.counters import COUNTERS, STATUS_FIELDS, counter_aggregates
+from appointments.models import Appointment
+
+COUNTER_FIELDS = list(STATUS_FIELDS.values()) + ['total']
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-doctor and per-patient appointment counters and fix any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing changes.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for counter_model, owner_field, _ in COUNTERS:
+            created, fixed = self.reconcile(counter_model, owner_field, options['dry_run'], options['batch_size'])
+            self.stdout.write(
+                f"{counter_model._meta.verbose_name}: {created} missing, {fixed} drifted"
+                + (' (dry run)' if options['dry_run'] else '')
+            )
+
+    def reconcile(self, counter_model, owner_field, dry_run, batch_size):
+        expected = {
+            row.pop(owner_field): row
+            for row in Appointment.objects.order_by().values(owner_field).annotate(**counter_aggregates())
+        }
+        zero = dict.fromkeys(COUNTER_FIELDS, 0)
+
+        to_update = []
+        for counter in counter_model.objects.iterator(chunk_size=batch_size):
+            values = expected.pop(counter.pk, zero)
+            if any(getattr(counter, field) != values[field] for field in COUNTER_FIELDS):
+                for field in COUNTER_FIELDS:
+                    setattr(counter, field, values[field])
+                to_update.append(counter)
+        # Whatever is left in `expected` has appointments but no counter row yet.
+        to_create = [counter_model(**{owner_field: owner_id}, **values) for owner_id, values in expected.items()]
+
+        if not dry_run:
+            with transaction.atomic():
+                counter_model.objects.bulk_create(to_create, batch_size=batch_size)
+                counter_model.objects.bulk_update(to_update, COUNTER_FIELDS, batch_size=batch_size)
+        return len(to_create), len(to_update)
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_alter_contactquery_options'),
+        ('appointments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorAppointmentCounter',
+            fields=[
+                ('scheduled', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('cancelled', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('doctor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='appointment_counter', serialize=False, to='accounts.doctor')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PatientAppointmentCounter',
+            fields=[
+                ('scheduled', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('cancelled', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('patient', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='appointment_counter', serialize=False, to='accounts.patient')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
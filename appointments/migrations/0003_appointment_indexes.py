@@ -0,0 +1,34 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_and_contactquery_indexes'),
+        ('appointments', '0002_appointment_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['-date', '-time'], name='appt_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', '-date', '-time'], name='appt_doctor_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'status', '-date', '-time'], name='appt_doctor_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', '-date', '-time'], name='appt_patient_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'status', '-date', '-time'], name='appt_patient_status_date_idx'),
+        ),
+    ]
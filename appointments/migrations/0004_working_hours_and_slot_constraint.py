@@ -0,0 +1,66 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_bookings(apps, schema_editor):
+    # The slot constraint below admits one live booking per doctor and start
+    # time. Existing clashes are listed for someone to resolve (cancel or
+    # move all but one) rather than changed here.
+    Appointment = apps.get_model('appointments', 'Appointment')
+    live = Appointment.objects.exclude(status='CANCELLED')
+    clashes = live.values('doctor_id', 'date', 'time').annotate(bookings=Count('id')).filter(bookings__gt=1).order_by()
+    groups = [
+        sorted(live.filter(doctor_id=clash['doctor_id'], date=clash['date'], time=clash['time']).values_list('id', flat=True))
+        for clash in clashes
+    ]
+    if groups:
+        raise RuntimeError(
+            'Live appointments share a doctor, date and start time; resolve them before migrating. '
+            f'Clashing appointment ids: {"; ".join(", ".join(map(str, ids)) for ids in groups)}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_and_contactquery_indexes'),
+        ('appointments', '0003_appointment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorWorkingHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('slot_minutes', models.PositiveSmallIntegerField(default=30)),
+            ],
+            options={
+                'verbose_name_plural': 'Doctor working hours',
+                'ordering': ['doctor', 'weekday', 'start_time'],
+            },
+        ),
+        migrations.RunPython(check_duplicate_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'CANCELLED'), _negated=True), fields=('doctor', 'date', 'time'), name='appt_doctor_slot_unique', violation_error_message='This time slot is already booked for the selected doctor.'),
+        ),
+        migrations.AddField(
+            model_name='doctorworkinghours',
+            name='doctor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='working_hours', to='accounts.doctor'),
+        ),
+        migrations.AddConstraint(
+            model_name='doctorworkinghours',
+            constraint=models.CheckConstraint(condition=models.Q(('end_time__gt', models.F('start_time'))), name='working_hours_end_after_start'),
+        ),
+        migrations.AddConstraint(
+            model_name='doctorworkinghours',
+            constraint=models.CheckConstraint(condition=models.Q(('slot_minutes__gt', 0)), name='working_hours_positive_slot'),
+        ),
+    ]
@@ -1,8 +1,8 @@
-from django.db import models
-from accounts.models import Doctor, Patient
+from django.db import models, router, transaction
+from accounts.models import Doctor, Patient, TrackedModel
 
 
-class Appointment(models.Model):
+class Appointment(TrackedModel):
     STATUS_CHOICES = (
         ('SCHEDULED', 'Scheduled'),
         ('COMPLETED', 'Completed'),
@@ -15,10 +15,135 @@ class Appointment(models.Model):
     time = models.TimeField()
     reason = models.TextField(blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='SCHEDULED')
+    # Length of the booked slot, fixed at booking time; with `time` it gives
+    # the interval appointments.overlap keeps from overlapping.
+    slot_minutes = models.PositiveSmallIntegerField(default=30, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-date', '-time']
+        indexes = [
+            models.Index(fields=['-date', '-time'], name='appt_date_time_idx'),
+            models.Index(fields=['doctor', '-date', '-time'], name='appt_doctor_date_idx'),
+            models.Index(fields=['doctor', 'status', '-date', '-time'], name='appt_doctor_status_date_idx'),
+            models.Index(fields=['patient', '-date', '-time'], name='appt_patient_date_idx'),
+            models.Index(fields=['patient', 'status', '-date', '-time'], name='appt_patient_status_date_idx'),
+        ]
+        constraints = [
+            # Same-start clashes, with a validation message. Overlaps at
+            # different start times (after the grid changed) are rejected by
+            # the database guard installed by appointments.overlap.
+            models.UniqueConstraint(
+                fields=['doctor', 'date', 'time'],
+                condition=~models.Q(status='CANCELLED'),
+                name='appt_doctor_slot_unique',
+                violation_error_message='This time slot is already booked for the selected doctor.',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.patient} with {self.doctor} on {self.date} {self.time}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = instance.counter_state()
+        instance._loaded_slot = instance.slot_key()
+        return instance
+
+    def counter_state(self):
+        # Read straight from __dict__ so deferred fields are not fetched.
+        return (self.__dict__.get('doctor_id'), self.__dict__.get('patient_id'), self.__dict__.get('status'))
+
+    def slot_key(self):
+        return (self.__dict__.get('doctor_id'), self.__dict__.get('date'), self.__dict__.get('time'))
+
+    def prepare_save(self):
+        # The slot length is taken from the grid only when the booking is new
+        # or moved. Bulk writes call this themselves since they skip save();
+        # returns the fields it sets.
+        from .slots import slot_length
+
+        if self.slot_key() != getattr(self, '_loaded_slot', None):
+            self.slot_minutes = slot_length(self.doctor_id, self.date, self.time)
+        return ('slot_minutes',)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'doctor', 'date', 'time'} & set(update_fields):
+            fields = self.prepare_save()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *fields}
+        # The post_save counter update must commit or roll back with the row.
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            if not self._state.adding and self.pk is not None:
+                # Deltas are taken from the row as committed, locked until
+                # this save commits: a concurrent request may have moved it
+                # since this instance was loaded.
+                current = (
+                    Appointment.objects.using(using)
+                    .select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list('doctor_id', 'patient_id', 'status')
+                    .first()
+                )
+                if current is not None:
+                    self._loaded_state = current
+            super().save(*args, **kwargs)
+        self._loaded_state = self.counter_state()
+        self._loaded_slot = self.slot_key()
+
+
+class DoctorWorkingHours(models.Model):
+    WEEKDAY_CHOICES = (
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    )
+
+    doctor = models.ForeignKey(Doctor, related_name='working_hours', on_delete=models.CASCADE)
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    slot_minutes = models.PositiveSmallIntegerField(default=30)
+
+    class Meta:
+        ordering = ['doctor', 'weekday', 'start_time']
+        verbose_name_plural = 'Doctor working hours'
+        constraints = [
+            models.CheckConstraint(condition=models.Q(end_time__gt=models.F('start_time')), name='working_hours_end_after_start'),
+            models.CheckConstraint(condition=models.Q(slot_minutes__gt=0), name='working_hours_positive_slot'),
+        ]
+
+    def __str__(self):
+        return f"{self.doctor} {self.get_weekday_display()} {self.start_time}-{self.end_time}"
+
+
+class AppointmentCounter(models.Model):
+    scheduled = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class DoctorAppointmentCounter(AppointmentCounter):
+    doctor = models.OneToOneField(Doctor, on_delete=models.CASCADE, primary_key=True, related_name='appointment_counter')
+
+    def __str__(self):
+        return f"Appointment counter for {self.doctor_id}"
+
+
+class PatientAppointmentCounter(AppointmentCounter):
+    patient = models.OneToOneField(Patient, on_delete=models.CASCADE, primary_key=True, related_name='appointment_counter')
+
+    def __str__(self):
+        return f"Appointment counter for {self.patient_id}"
@@ -0,0 +1,73 @@
+# Live appointments of one doctor may not overlap in time. Kept by the
+# database itself, so every write path (save, bulk_create, bulk_update,
+# queryset.update, raw SQL) is covered; a violation is an IntegrityError:
+#   PostgreSQL: an exclusion constraint over the booked timestamp range;
+#   SQLite: triggers that abort an insert or update that would overlap.
+# An appointment books [date + time, date + time + slot_minutes).
+TABLE = 'appointments_appointment'
+GUARD_NAME = 'appt_doctor_no_overlap'
+
+
+def _sqlite_range(alias):
+    # Doubled: schema_editor.execute() runs the SQL through placeholder
+    # substitution.
+    start = f"CAST(strftime('%%s', {alias}.date || ' ' || {alias}.time) AS INTEGER)"
+    return start, f'({start} + {alias}.slot_minutes * 60)'
+
+
+def _sqlite_statements():
+    new_start, new_end = _sqlite_range('NEW')
+    old_start, old_end = _sqlite_range('a')
+    clash = (
+        f"NEW.status <> 'CANCELLED' AND EXISTS (SELECT 1 FROM {TABLE} a WHERE a.doctor_id = NEW.doctor_id "
+        f"AND a.status <> 'CANCELLED' AND a.date BETWEEN date(NEW.date, '-1 day') AND date(NEW.date, '+1 day') "
+        f'AND {old_start} < {new_end} AND {new_start} < {old_end}{{other}})'
+    )
+    abort = f"BEGIN SELECT RAISE(ABORT, '{GUARD_NAME}'); END"
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {GUARD_NAME}_insert BEFORE INSERT ON {TABLE} '
+        f"WHEN {clash.format(other='')} {abort}",
+        f'CREATE TRIGGER IF NOT EXISTS {GUARD_NAME}_update BEFORE UPDATE OF doctor_id, date, time, slot_minutes, status ON {TABLE} '
+        f"WHEN {clash.format(other=' AND a.id <> NEW.id')} {abort}",
+    ]
+
+
+def _postgresql_statements():
+    return [
+        # doctor_id WITH = in a GiST index needs btree_gist.
+        'CREATE EXTENSION IF NOT EXISTS btree_gist',
+        f'ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {GUARD_NAME}',
+        f'ALTER TABLE {TABLE} ADD CONSTRAINT {GUARD_NAME} EXCLUDE USING gist '
+        "(doctor_id WITH =, tsrange(date + time, date + time + slot_minutes * interval '1 minute') WITH &&) "
+        "WHERE (status <> 'CANCELLED')",
+    ]
+
+
+def _sqlite_drop_statements():
+    return [f'DROP TRIGGER IF EXISTS {GUARD_NAME}_{event}' for event in ('insert', 'update')]
+
+
+def _postgresql_drop_statements():
+    return [f'ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {GUARD_NAME}']
+
+
+INSTALL_STATEMENTS = {'sqlite': _sqlite_statements, 'postgresql': _postgresql_statements}
+DROP_STATEMENTS = {'sqlite': _sqlite_drop_statements, 'postgresql': _postgresql_drop_statements}
+
+
+def install_overlap_guard(schema_editor):
+    # Idempotent: on SQLite it also re-creates the triggers lost when a later
+    # migration rebuilds the appointments table.
+    statements = INSTALL_STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    for sql in statements():
+        schema_editor.execute(sql)
+
+
+def drop_overlap_guard(schema_editor):
+    statements = DROP_STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    for sql in statements():
+        schema_editor.execute(sql)
@@ -1,9 +1,20 @@
+from datetime import timedelta
+
 from rest_framework import serializers
 
+from accounts.bulk import BulkListSerializer, PreloadedPrimaryKeyRelatedField
+from accounts.fieldsets import SparseFieldsetSerializerMixin
+from accounts.models import Doctor
+
 from .models import Appointment
+from .slots import MAX_RANGE_DAYS, is_slot_available
+
+SLOT_UNAVAILABLE_MESSAGE = 'This time is not a free slot for the selected doctor. Please pick one of the available slots.'
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Appointment
         fields = [
@@ -17,3 +28,43 @@ class AppointmentSerializer(serializers.ModelSerializer):
             'created_at',
         ]
         read_only_fields = ['id', 'created_at']
+        list_serializer_class = BulkListSerializer
+
+    def run_validators(self, value):
+        # The unique validator of the live-slot constraint reads `status` from
+        # the data even for partial updates; give it the current one.
+        if self.instance is not None and 'status' not in value:
+            value = {**value, 'status': self.instance.status}
+        super().run_validators(value)
+
+    def validate(self, attrs):
+        # The same slot-grid and overlap check as the booking form, also run
+        # for each item of a bulk write. Only changes that take a slot (a new,
+        # moved or un-cancelled appointment) are checked.
+        instance = self.instance
+        current = {name: getattr(instance, name) for name in ('doctor', 'date', 'time', 'status')} if instance else {}
+        booking = {'status': 'SCHEDULED', **current, **attrs}
+        if booking['status'] == 'CANCELLED':
+            return attrs
+        takes_slot = instance is None or current['status'] == 'CANCELLED' or any(
+            booking[name] != current[name] for name in ('doctor', 'date', 'time')
+        )
+        if takes_slot and not is_slot_available(
+            booking['doctor'], booking['date'], booking['time'], exclude=instance.pk if instance else None
+        ):
+            raise serializers.ValidationError({'time': [SLOT_UNAVAILABLE_MESSAGE]})
+        return attrs
+
+
+class SlotQuerySerializer(serializers.Serializer):
+    doctor = serializers.PrimaryKeyRelatedField(queryset=Doctor.objects.filter(user__is_active=True))
+    start = serializers.DateField()
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault('end', attrs['start'])
+        if attrs['end'] < attrs['start']:
+            raise serializers.ValidationError({'end': 'End date must not be before start date.'})
+        if attrs['end'] - attrs['start'] >= timedelta(days=MAX_RANGE_DAYS):
+            raise serializers.ValidationError({'end': f'Date range is limited to {MAX_RANGE_DAYS} days.'})
+        return attrs
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.bulk import bulk_saved
+
+from .counters import rebuild_owner_counters, record_appointment_change, record_appointment_changes
+from .models import Appointment
+
+
+@receiver(post_save, sender=Appointment)
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = instance.counter_state()
+    if created:
+        record_appointment_change(None, current)
+    elif hasattr(instance, '_loaded_state'):
+        record_appointment_change(instance._loaded_state, current)
+    else:
+        # Saved over an existing row without loading it first, so the old
+        # status is unknown; recount this doctor and patient from scratch.
+        rebuild_owner_counters(current)
+
+
+@receiver(post_delete, sender=Appointment)
+def update_counters_on_delete(sender, instance, **kwargs):
+    previous = getattr(instance, '_loaded_state', None) or instance.counter_state()
+    record_appointment_change(previous, None)
+
+
+@receiver(bulk_saved, sender=Appointment)
+def update_counters_on_bulk_save(sender, instances, previous, **kwargs):
+    record_appointment_changes(
+        (state, instance.counter_state()) for state, instance in zip(previous, instances)
+    )
@@ -0,0 +1,89 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import time, timedelta
+
+from django.utils import timezone
+
+from .models import Appointment, DoctorWorkingHours
+
+DEFAULT_SLOT_MINUTES = 30
+# Used for doctors who have not configured working hours: Mon-Fri, 9 to 5.
+DEFAULT_WORKING_HOURS = {weekday: [(time(9, 0), time(17, 0), DEFAULT_SLOT_MINUTES)] for weekday in range(5)}
+MAX_RANGE_DAYS = 31
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def working_hours_for(doctor):
+    hours = defaultdict(list)
+    for block in DoctorWorkingHours.objects.filter(doctor=doctor).order_by('weekday', 'start_time'):
+        hours[block.weekday].append((block.start_time, block.end_time, block.slot_minutes))
+    return hours or DEFAULT_WORKING_HOURS
+
+
+def slot_length(doctor, day, at):
+    # Minutes booked by an appointment starting at `at`: the slot length of
+    # the working-hours block it falls in, else the default.
+    minute = _minutes(at)
+    for start, end, length in working_hours_for(doctor).get(day.weekday(), []):
+        if _minutes(start) <= minute < _minutes(end):
+            return length
+    return DEFAULT_SLOT_MINUTES
+
+
+def busy_minutes(doctor, start_date, end_date, exclude=None):
+    # Served by the (doctor, date, time) indexes as one range scan; per day
+    # the booked [start, end) minute ranges come back sorted and merged so
+    # overlap checks can bisect. Each booking keeps the slot length it was
+    # made with, so a later change of the grid does not hide it.
+    # `exclude` is the pk of an appointment being moved, which does not
+    # block its own new slot.
+    busy = defaultdict(list)
+    rows = Appointment.objects.filter(doctor=doctor, date__range=(start_date, end_date)).exclude(status='CANCELLED')
+    if exclude is not None:
+        rows = rows.exclude(pk=exclude)
+    rows = rows.order_by('date', 'time').values_list('date', 'time', 'slot_minutes')
+    for day, at, length in rows:
+        start = _minutes(at)
+        ranges = busy[day]
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], start + length))
+        else:
+            ranges.append((start, start + length))
+    return busy
+
+
+def _overlaps(busy, start, length):
+    # The ranges are disjoint and sorted, so only the last one starting
+    # before the candidate [start, start + length) ends can reach into it.
+    index = bisect_left(busy, (start + length,)) - 1
+    return index >= 0 and busy[index][1] > start
+
+
+def free_slots(doctor, start_date, end_date=None, now=None, exclude=None):
+    end_date = end_date or start_date
+    now = timezone.localtime(now)
+    hours = working_hours_for(doctor)
+    busy = busy_minutes(doctor, start_date, end_date, exclude=exclude)
+
+    slots = {}
+    day = start_date
+    while day <= end_date:
+        times = []
+        for start, end, length in hours.get(day.weekday(), []):
+            minute, last = _minutes(start), _minutes(end) - length
+            while minute <= last:
+                at = time(minute // 60, minute % 60)
+                in_future = day > now.date() or (day == now.date() and at > now.time())
+                if in_future and not _overlaps(busy[day], minute, length):
+                    times.append(at)
+                minute += length
+        slots[day] = times
+        day += timedelta(days=1)
+    return slots
+
+
+def is_slot_available(doctor, day, at, now=None, exclude=None):
+    return at.replace(second=0, microsecond=0) in free_slots(doctor, day, day, now=now, exclude=exclude).get(day, [])
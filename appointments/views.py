@@ -1,13 +1,28 @@
-from rest_framework import permissions, viewsets
+from django.db import IntegrityError
+from rest_framework import permissions, serializers, viewsets
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from accounts.bulk import BulkWriteViewSetMixin
+from accounts.conditional import ConditionalGetViewSetMixin
+from accounts.fieldsets import SparseFieldsetViewSetMixin
+from accounts.pagination import AppointmentCursorPagination
 
 from .models import Appointment
-from .serializers import AppointmentSerializer
+from .serializers import AppointmentSerializer, SlotQuerySerializer
+from .slots import free_slots
+
+SLOT_CONFLICT_MESSAGE = 'This time slot is already booked for the selected doctor.'
 
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentViewSet(ConditionalGetViewSetMixin, BulkWriteViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     serializer_class = AppointmentSerializer
+    pagination_class = AppointmentCursorPagination
     permission_classes = [IsAuthenticated]
+    bulk_conflict_message = SLOT_CONFLICT_MESSAGE
 
     def get_queryset(self):
         queryset = Appointment.objects.select_related('doctor__user', 'patient__user').all()
@@ -22,14 +37,52 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         return queryset.none()
 
     def get_permissions(self):
-        if self.action in ['update', 'partial_update', 'destroy']:
+        updating_in_bulk = self.action == 'bulk' and self.request.method == 'PATCH'
+        if self.action in ['update', 'partial_update', 'destroy'] or updating_in_bulk:
             if self.request.user.role not in ['ADMIN', 'DOCTOR']:
                 return [permissions.IsAdminUser()]
         return super().get_permissions()
 
     def perform_create(self, serializer):
+        user = self.request.user
+        try:
+            if user.role == 'PATIENT' and hasattr(user, 'patient_profile'):
+                serializer.save(patient=user.patient_profile)
+                return
+            serializer.save()
+        except IntegrityError:
+            # Lost a race for the slot against a concurrent booking.
+            raise serializers.ValidationError({'time': [SLOT_CONFLICT_MESSAGE]})
+
+    def perform_bulk_create(self, serializer):
         user = self.request.user
         if user.role == 'PATIENT' and hasattr(user, 'patient_profile'):
             serializer.save(patient=user.patient_profile)
             return
         serializer.save()
+
+    def perform_update(self, serializer):
+        try:
+            serializer.save()
+        except IntegrityError:
+            raise serializers.ValidationError({'time': [SLOT_CONFLICT_MESSAGE]})
+
+    @action(
+        detail=False,
+        methods=['get'],
+        authentication_classes=[JWTAuthentication, SessionAuthentication],
+    )
+    def slots(self, request):
+        query = SlotQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        doctor = query.validated_data['doctor']
+        slots = free_slots(doctor, query.validated_data['start'], query.validated_data['end'])
+        return Response(
+            {
+                'doctor': doctor.id,
+                'slots': [
+                    {'date': day.isoformat(), 'times': [at.strftime('%H:%M') for at in times]}
+                    for day, times in slots.items()
+                ],
+            }
+        )
@@ -0,0 +1,29 @@
+from django.db.models import Count, Q, Sum
+
+from accounts.caching import cached_aggregate, refresh_aggregate
+
+from .models import Invoice
+
+INVOICE_TOTALS_KEY = 'billing:invoice_totals'
+INVOICE_TOTALS_TTL = 30
+INVOICE_TOTALS_STALE_TTL = 300
+
+
+def compute_invoice_totals():
+    totals = Invoice.objects.aggregate(
+        total_revenue=Sum('amount', filter=Q(paid=True)),
+        pending_amount=Sum('amount', filter=Q(paid=False)),
+        paid_count=Count('id', filter=Q(paid=True)),
+        unpaid_count=Count('id', filter=Q(paid=False)),
+    )
+    totals['total_revenue'] = totals['total_revenue'] or 0
+    totals['pending_amount'] = totals['pending_amount'] or 0
+    return totals
+
+
+def invoice_totals():
+    return cached_aggregate(INVOICE_TOTALS_KEY, compute_invoice_totals, ttl=INVOICE_TOTALS_TTL, stale_ttl=INVOICE_TOTALS_STALE_TTL)
+
+
+def refresh_invoice_totals():
+    return refresh_aggregate(INVOICE_TOTALS_KEY, compute_invoice_totals, ttl=INVOICE_TOTALS_TTL, stale_ttl=INVOICE_TOTALS_STALE_TTL)
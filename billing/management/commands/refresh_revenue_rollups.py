@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from billing.rollups import refresh_revenue_rollups
+
+
+class Command(BaseCommand):
+    help = 'Bring the daily revenue rollups up to date (run periodically, e.g. from cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recompute every day from scratch.')
+
+    def handle(self, *args, **options):
+        refreshed = refresh_revenue_rollups(rebuild=options['rebuild'])
+        if refreshed is None:
+            self.stdout.write('Rebuilt all revenue rollups.')
+        else:
+            self.stdout.write(f'Recomputed {refreshed} day(s) of revenue rollups.')
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_appointment_indexes'),
+        ('billing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(condition=models.Q(('paid', True)), fields=['-issued_at'], name='invoice_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(condition=models.Q(('paid', False)), fields=['-issued_at'], name='invoice_unpaid_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_working_hours_and_slot_constraint'),
+        ('billing', '0002_invoice_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['-issued_at', '-id'], name='invoice_issued_idx'),
+        ),
+    ]
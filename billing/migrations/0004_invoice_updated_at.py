@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 05:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0003_invoice_issued_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
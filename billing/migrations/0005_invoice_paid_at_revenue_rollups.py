@@ -0,0 +1,70 @@
+# Generated by Django 5.2.11 on 2026-10-18 05:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_paid_at(apps, schema_editor):
+    # When existing invoices were paid is unknown; their issue time is the
+    # closest record there is.
+    Invoice = apps.get_model('billing', 'Invoice')
+    Invoice.objects.filter(paid=True, paid_at__isnull=True).update(paid_at=models.F('issued_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_profile_updated_at'),
+        ('appointments', '0005_appointment_updated_at'),
+        ('billing', '0004_invoice_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevenueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('invoiced_count', models.PositiveIntegerField(default=0)),
+                ('invoiced_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('paid_count', models.PositiveIntegerField(default=0)),
+                ('paid_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RevenueRollupDirtyDay',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RevenueRollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='paid_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['paid_at'], name='invoice_paid_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['updated_at'], name='invoice_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='revenuerollup',
+            name='doctor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revenue_rollups', to='accounts.doctor'),
+        ),
+        migrations.AddConstraint(
+            model_name='revenuerollup',
+            constraint=models.UniqueConstraint(fields=('day', 'doctor'), name='revenue_rollup_day_doctor_unique'),
+        ),
+        migrations.RunPython(backfill_paid_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def seed_revenue_rollups(apps, schema_editor):
+    # Builds the rollups of the invoices that already exist, so the revenue
+    # series is complete right after deploy rather than after the first
+    # invoice write and worker run. Later changes are found from the
+    # watermark set here, with the same two-minute overlap as a refresh.
+    Invoice = apps.get_model('billing', 'Invoice')
+    RevenueRollup = apps.get_model('billing', 'RevenueRollup')
+    RevenueRollupWatermark = apps.get_model('billing', 'RevenueRollupWatermark')
+    started = timezone.now()
+    tzinfo = timezone.get_current_timezone()
+    rows = {}
+    sources = (
+        (Invoice.objects.all(), 'issued_at', 'invoiced'),
+        (Invoice.objects.filter(paid=True), 'paid_at', 'paid'),
+    )
+    for queryset, field, prefix in sources:
+        totals = (
+            queryset.order_by()
+            .annotate(day=TruncDate(field, tzinfo=tzinfo))
+            .values_list('day', 'appointment__doctor_id')
+            .annotate(count=Count('id'), amount=Sum('amount'))
+        )
+        for day, doctor_id, count, amount in totals:
+            row = rows.setdefault((day, doctor_id), RevenueRollup(day=day, doctor_id=doctor_id))
+            setattr(row, f'{prefix}_count', count)
+            setattr(row, f'{prefix}_amount', amount)
+    RevenueRollup.objects.all().delete()
+    RevenueRollup.objects.bulk_create(rows.values(), batch_size=1000)
+    RevenueRollupWatermark.objects.update_or_create(name='revenue', defaults={'watermark': started - timedelta(minutes=2)})
+
+
+def clear_revenue_rollups(apps, schema_editor):
+    apps.get_model('billing', 'RevenueRollup').objects.all().delete()
+    apps.get_model('billing', 'RevenueRollupWatermark').objects.filter(name='revenue').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0005_invoice_paid_at_revenue_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_revenue_rollups, clear_revenue_rollups),
+    ]
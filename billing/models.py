@@ -1,12 +1,89 @@
 from django.db import models
+from django.utils import timezone
+
+from accounts.models import Doctor, TrackedModel
 from appointments.models import Appointment
 
 
-class Invoice(models.Model):
+class Invoice(TrackedModel):
     appointment = models.OneToOneField(Appointment, on_delete=models.CASCADE, related_name='invoice')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     paid = models.BooleanField(default=False)
     issued_at = models.DateTimeField(auto_now_add=True)
+    paid_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-issued_at'], condition=models.Q(paid=True), name='invoice_paid_idx'),
+            models.Index(fields=['-issued_at'], condition=models.Q(paid=False), name='invoice_unpaid_idx'),
+            models.Index(fields=['-issued_at', '-id'], name='invoice_issued_idx'),
+            models.Index(fields=['paid_at'], name='invoice_paid_at_idx'),
+            models.Index(fields=['updated_at'], name='invoice_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Invoice #{self.id} - Appointment #{self.appointment_id}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = instance.counter_state()
+        instance._loaded_paid_at = instance.__dict__.get('paid_at')
+        return instance
+
+    def counter_state(self):
+        return (self.__dict__.get('paid'), self.__dict__.get('amount'))
+
+    def prepare_save(self):
+        # paid_at records when the invoice was (last) paid. Bulk writes call
+        # this themselves since they skip save(); returns the fields it sets.
+        if self.paid and self.paid_at is None:
+            self.paid_at = timezone.now()
+        elif not self.paid:
+            self.paid_at = None
+        return ('paid_at',)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        fields = self.prepare_save()
+        if update_fields and 'paid' in update_fields:
+            kwargs['update_fields'] = {*update_fields, *fields}
+        super().save(*args, **kwargs)
+        self._loaded_state = self.counter_state()
+        self._loaded_paid_at = self.paid_at
+
+
+class RevenueRollup(models.Model):
+    # Invoices issued and paid per doctor per local day; maintained by
+    # billing.rollups from an updated_at watermark plus dirty days.
+    day = models.DateField()
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='revenue_rollups')
+    invoiced_count = models.PositiveIntegerField(default=0)
+    invoiced_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid_count = models.PositiveIntegerField(default=0)
+    paid_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'doctor'], name='revenue_rollup_day_doctor_unique'),
+        ]
+
+    def __str__(self):
+        return f"Revenue for {self.doctor_id} on {self.day}"
+
+
+class RevenueRollupDirtyDay(models.Model):
+    # Days an invoice left (deleted, unpaid, moved) since the last refresh;
+    # the watermark only finds the days invoices are in now.
+    day = models.DateField(primary_key=True)
+
+    def __str__(self):
+        return str(self.day)
+
+
+class RevenueRollupWatermark(models.Model):
+    name = models.CharField(max_length=50, primary_key=True)
+    watermark = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} up to {self.watermark}"
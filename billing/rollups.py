@@ -0,0 +1,120 @@
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from accounts.routers import primary_reads
+
+from .models import Invoice, RevenueRollup, RevenueRollupDirtyDay, RevenueRollupWatermark
+
+WATERMARK_NAME = 'revenue'
+# A row saved just before a refresh can commit just after it with an earlier
+# updated_at; re-reading this overlap next time catches it (recomputing a
+# day is idempotent).
+WATERMARK_OVERLAP = timedelta(minutes=2)
+MAX_SERIES_DAYS = 3 * 366
+
+SERIES_PERIODS = {
+    'day': lambda: F('day'),
+    'week': lambda: TruncWeek('day'),
+    'month': lambda: TruncMonth('day'),
+}
+SERIES_GROUPS = {
+    'doctor': ('doctor_id',),
+    'specialization': ('doctor__specialty_id', 'doctor__specialty__name'),
+}
+
+
+def local_days(*values):
+    return {timezone.localdate(value) for value in values if value is not None}
+
+
+def mark_days_dirty(days):
+    if days:
+        RevenueRollupDirtyDay.objects.bulk_create([RevenueRollupDirtyDay(day=day) for day in days], ignore_conflicts=True)
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _daily_totals(queryset, field, days):
+    # Per (local day, doctor) count and amount. Days are bounded with plain
+    # range comparisons so the issued_at/paid_at indexes are used.
+    if days is not None:
+        bounds = Q()
+        for day in days:
+            bounds |= Q(**{f'{field}__gte': _day_start(day), f'{field}__lt': _day_start(day + timedelta(days=1))})
+        queryset = queryset.filter(bounds)
+    return (
+        queryset.order_by()
+        .annotate(day=TruncDate(field, tzinfo=timezone.get_current_timezone()))
+        .values_list('day', 'appointment__doctor_id')
+        .annotate(count=Count('id'), amount=Sum('amount'))
+    )
+
+
+def recompute_days(days=None):
+    # Rewrites the rollup rows of `days` (all days when None) from invoices.
+    rows = {}
+    for day, doctor_id, count, amount in _daily_totals(Invoice.objects.all(), 'issued_at', days):
+        row = rows.setdefault((day, doctor_id), RevenueRollup(day=day, doctor_id=doctor_id))
+        row.invoiced_count, row.invoiced_amount = count, amount
+    for day, doctor_id, count, amount in _daily_totals(Invoice.objects.filter(paid=True), 'paid_at', days):
+        row = rows.setdefault((day, doctor_id), RevenueRollup(day=day, doctor_id=doctor_id))
+        row.paid_count, row.paid_amount = count, amount
+
+    stale = RevenueRollup.objects.all() if days is None else RevenueRollup.objects.filter(day__in=days)
+    stale.delete()
+    RevenueRollup.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
+
+
+def refresh_revenue_rollups(rebuild=False):
+    # Recomputes only the days touched since the watermark: the days of
+    # invoices updated after it, plus the days invoices left (dirty days).
+    # Returns the number of days recomputed, or None after a full rebuild.
+    with primary_reads(), transaction.atomic():
+        state, _ = RevenueRollupWatermark.objects.select_for_update().get_or_create(name=WATERMARK_NAME)
+        started = timezone.now()
+        if rebuild or state.watermark is None:
+            RevenueRollupDirtyDay.objects.all().delete()
+            recompute_days(None)
+            refreshed = None
+        else:
+            dirty = RevenueRollupDirtyDay.objects.all()
+            days = set(dirty.values_list('day', flat=True))
+            for issued_at, paid_at in Invoice.objects.filter(updated_at__gt=state.watermark).values_list('issued_at', 'paid_at'):
+                days |= local_days(issued_at, paid_at)
+            if not days:
+                return 0
+            # Cleared before recomputing, so a day dirtied meanwhile survives
+            # for the next refresh.
+            dirty.filter(day__in=days).delete()
+            recompute_days(days)
+            refreshed = len(days)
+        state.watermark = started - WATERMARK_OVERLAP
+        state.save(update_fields=['watermark'])
+    return refreshed
+
+
+def revenue_series(start, end, period='day', group=None, doctor=None, specialization=None):
+    queryset = RevenueRollup.objects.filter(day__gte=start, day__lte=end)
+    if doctor is not None:
+        queryset = queryset.filter(doctor=doctor)
+    if specialization is not None:
+        queryset = queryset.filter(doctor__specialty=specialization)
+    columns = ['period', *SERIES_GROUPS.get(group, ())]
+    return list(
+        queryset.annotate(period=SERIES_PERIODS[period]())
+        .values(*columns)
+        .annotate(
+            invoiced_count=Sum('invoiced_count'),
+            invoiced_amount=Sum('invoiced_amount'),
+            paid_count=Sum('paid_count'),
+            paid_amount=Sum('paid_amount'),
+        )
+        .order_by(*columns)
+    )
@@ -1,10 +1,39 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
 
+from accounts.bulk import BulkListSerializer, PreloadedPrimaryKeyRelatedField
+from accounts.fieldsets import SparseFieldsetSerializerMixin
+from accounts.models import Doctor, Specialization
+
 from .models import Invoice
+from .rollups import MAX_SERIES_DAYS, SERIES_GROUPS, SERIES_PERIODS
+
 
+class InvoiceSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
 
-class InvoiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Invoice
-        fields = ['id', 'appointment', 'amount', 'paid', 'issued_at']
-        read_only_fields = ['id', 'issued_at']
+        fields = ['id', 'appointment', 'amount', 'paid', 'issued_at', 'paid_at']
+        read_only_fields = ['id', 'issued_at', 'paid_at']
+        list_serializer_class = BulkListSerializer
+
+
+class RevenueSeriesQuerySerializer(serializers.Serializer):
+    period = serializers.ChoiceField(choices=list(SERIES_PERIODS), default='day')
+    group = serializers.ChoiceField(choices=list(SERIES_GROUPS), required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    doctor = serializers.PrimaryKeyRelatedField(queryset=Doctor.objects.all(), required=False)
+    specialization = serializers.PrimaryKeyRelatedField(queryset=Specialization.objects.all(), required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault('end', timezone.localdate())
+        attrs.setdefault('start', attrs['end'] - timedelta(days=29))
+        if attrs['end'] < attrs['start']:
+            raise serializers.ValidationError({'end': 'End date must not be before start date.'})
+        if attrs['end'] - attrs['start'] >= timedelta(days=MAX_SERIES_DAYS):
+            raise serializers.ValidationError({'end': f'Date range is limited to {MAX_SERIES_DAYS} days.'})
+        return attrs
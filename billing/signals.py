@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.bulk import bulk_saved
+from accounts.jobs import enqueue_once
+from appointments.models import Appointment
+
+from .models import Invoice
+from .rollups import local_days, mark_days_dirty
+
+# The rollup watermark finds the days an invoice is in now. These receivers
+# record the days it leaves, so those are recomputed too, and queue the
+# background refresh that brings the rollups up to date after the commit.
+
+
+def _schedule_refresh():
+    transaction.on_commit(lambda: enqueue_once('refresh_revenue_rollups'))
+
+
+def _vacated_days(instances):
+    days = set()
+    for instance in instances:
+        if hasattr(instance, '_loaded_paid_at'):
+            days |= local_days(instance._loaded_paid_at) - local_days(instance.paid_at)
+    return days
+
+
+@receiver(post_save, sender=Invoice)
+def mark_vacated_paid_day(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created:
+        mark_days_dirty(_vacated_days([instance]))
+    _schedule_refresh()
+
+
+@receiver(bulk_saved, sender=Invoice)
+def mark_vacated_paid_days(sender, instances, previous, **kwargs):
+    mark_days_dirty(_vacated_days(instance for instance, state in zip(instances, previous) if state is not None))
+    _schedule_refresh()
+
+
+@receiver(post_delete, sender=Invoice)
+def mark_deleted_invoice_days(sender, instance, **kwargs):
+    mark_days_dirty(local_days(instance.issued_at, instance.paid_at))
+    _schedule_refresh()
+
+
+def _reassigned(instances, previous):
+    # Appointments whose doctor changed; their invoice's days now belong to
+    # another doctor's rollup row.
+    return [instance.pk for instance, state in zip(instances, previous) if state is not None and state[0] != instance.doctor_id]
+
+
+def _mark_invoice_days(appointment_ids):
+    if appointment_ids:
+        days = set()
+        for issued_at, paid_at in Invoice.objects.filter(appointment_id__in=appointment_ids).values_list('issued_at', 'paid_at'):
+            days |= local_days(issued_at, paid_at)
+        if days:
+            mark_days_dirty(days)
+            _schedule_refresh()
+
+
+@receiver(post_save, sender=Appointment)
+def mark_reassigned_invoice_days(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created and hasattr(instance, '_loaded_state'):
+        _mark_invoice_days(_reassigned([instance], [instance._loaded_state]))
+
+
+@receiver(bulk_saved, sender=Appointment)
+def mark_reassigned_invoice_days_in_bulk(sender, instances, previous, **kwargs):
+    _mark_invoice_days(_reassigned(instances, previous))
@@ -1,17 +1,23 @@
-from django.db.models import Sum
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from accounts.bulk import BulkWriteViewSetMixin
+from accounts.conditional import ConditionalGetViewSetMixin
+from accounts.fieldsets import SparseFieldsetViewSetMixin
+from accounts.pagination import InvoiceCursorPagination
 from accounts.permissions import IsAdminRole
 
+from .aggregates import invoice_totals
 from .models import Invoice
-from .serializers import InvoiceSerializer
+from .rollups import revenue_series
+from .serializers import InvoiceSerializer, RevenueSeriesQuerySerializer
 
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(ConditionalGetViewSetMixin, BulkWriteViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     serializer_class = InvoiceSerializer
+    pagination_class = InvoiceCursorPagination
     permission_classes = [IsAuthenticated, IsAdminRole]
 
     def get_queryset(self):
@@ -19,13 +25,21 @@ class InvoiceViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def revenue(self, request):
-        paid_invoices = self.get_queryset().filter(paid=True)
-        unpaid_invoices = self.get_queryset().filter(paid=False)
+        return Response(invoice_totals())
+
+    @action(detail=False, methods=['get'], url_path='revenue/series')
+    def revenue_series(self, request):
+        # Reads only the daily rollups; invoice writes queue the job that
+        # refreshes them.
+        query = RevenueSeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
         return Response(
             {
-                'total_revenue': paid_invoices.aggregate(total=Sum('amount'))['total'] or 0,
-                'paid_count': paid_invoices.count(),
-                'unpaid_count': unpaid_invoices.count(),
-                'pending_amount': unpaid_invoices.aggregate(total=Sum('amount'))['total'] or 0,
+                'period': params['period'],
+                'group': params.get('group'),
+                'start': params['start'],
+                'end': params['end'],
+                'results': revenue_series(**params),
             }
         )
@@ -0,0 +1,43 @@
+import multiprocessing
+import os
+
+# Threaded WSGI workers by default: the views are sync, and each thread keeps
+# its database connection (conn_max_age) across requests. ASGI is opt-in with
+# GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker. It needs DATABASE_POOL
+# (psycopg 3), since Django opens a fresh connection for every ASGI request.
+# It also buffers streamed exports in memory before sending them.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+wsgi_app = 'HMS.asgi:application' if 'uvicorn' in worker_class.lower() else 'HMS.wsgi:application'
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Import Django once in the master; workers fork with it already loaded.
+preload_app = True
+# Recycle workers now and then, staggered so they do not all restart at once.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    # Sockets opened in the master while preloading must not be shared by
+    # the forked workers.
+    from django.core.cache import caches
+    from django.db import connections
+
+    connections.close_all()
+    caches.close_all()
+
+
+def post_worker_init(worker):
+    # Runs in the worker before it starts accepting connections.
+    from accounts.warmup import warm_up
+
+    try:
+        warm_up()
+    except Exception:
+        worker.log.exception('Warm-up failed; serving cold.')
@@ -1,9 +1,12 @@
 from django.contrib import admin
 
+from accounts.search import FullTextSearchAdminMixin
+
 from .models import Prescription
 
 
 @admin.register(Prescription)
-class PrescriptionAdmin(admin.ModelAdmin):
+class PrescriptionAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    search_kind = 'prescriptions'
     list_display = ('id', 'appointment', 'created_at')
-    search_fields = ('appointment__doctor__user__username', 'appointment__patient__user__username')
+    search_fields = ('diagnosis', 'medicines', 'notes', 'appointment__doctor__user__username', 'appointment__patient__user__username')
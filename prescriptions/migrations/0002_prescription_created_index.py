@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_working_hours_and_slot_constraint'),
+        ('prescriptions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['-created_at', '-id'], name='prescription_created_idx'),
+        ),
+    ]
@@ -1,13 +1,19 @@
 from django.db import models
+from accounts.models import TrackedModel
 from appointments.models import Appointment
 
 
-class Prescription(models.Model):
+class Prescription(TrackedModel):
     appointment = models.OneToOneField(Appointment, on_delete=models.CASCADE, related_name='prescription')
     diagnosis = models.TextField()
     medicines = models.TextField()
     notes = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='prescription_created_idx'),
+        ]
+
     def __str__(self):
         return f"Prescription for Appointment #{self.appointment_id}"
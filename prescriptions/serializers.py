@@ -1,10 +1,16 @@
 from rest_framework import serializers
 
+from accounts.bulk import BulkListSerializer, PreloadedPrimaryKeyRelatedField
+from accounts.fieldsets import SparseFieldsetSerializerMixin
+
 from .models import Prescription
 
 
-class PrescriptionSerializer(serializers.ModelSerializer):
+class PrescriptionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Prescription
         fields = ['id', 'appointment', 'diagnosis', 'medicines', 'notes', 'created_at']
         read_only_fields = ['id', 'created_at']
+        list_serializer_class = BulkListSerializer
@@ -1,12 +1,18 @@
 from rest_framework import permissions, viewsets
 from rest_framework.permissions import IsAuthenticated
 
+from accounts.bulk import BulkWriteViewSetMixin
+from accounts.conditional import ConditionalGetViewSetMixin
+from accounts.fieldsets import SparseFieldsetViewSetMixin
+from accounts.pagination import PrescriptionCursorPagination
+
 from .models import Prescription
 from .serializers import PrescriptionSerializer
 
 
-class PrescriptionViewSet(viewsets.ModelViewSet):
+class PrescriptionViewSet(ConditionalGetViewSetMixin, BulkWriteViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     serializer_class = PrescriptionSerializer
+    pagination_class = PrescriptionCursorPagination
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -25,7 +31,7 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
         return queryset.none()
 
     def get_permissions(self):
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'bulk']:
             if self.request.user.role not in ['ADMIN', 'DOCTOR']:
                 return [permissions.IsAdminUser()]
         return super().get_permissions()